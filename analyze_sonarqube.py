@@ -10,12 +10,32 @@ Usage:
     python analyze_sonarqube.py --diff old.txt new.txt   # compare two reports
 """
 
-import json
+import heapq
+import io
+import mmap
 import sys
 import os
 from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
 
+# orjson (C/SIMD parser) is much faster on multi-MB exports; stdlib fallback
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    import json
+    orjson = None
+    _loads = json.loads
+
+# ijson lets large reports be analyzed issue by issue without building the DOM
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
@@ -97,69 +117,107 @@ SEVERITY_MAP = {
 
 def load_report(filepath):
     """Load and parse the JSON report file."""
-    with open(filepath, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(filepath, "rb") as f:
+        # orjson parses straight from the mapped pages (no f.read() copy)
+        if orjson is not None and os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                return orjson.loads(view)
+        return _loads(f.read())
+
+
+_SLASH_TABLE = str.maketrans("/", "\\")
+
+
+def _basename(p):
+    """Last component of a / or \\ separated path (no Path object needed)."""
+    return p.rsplit("\\", 1)[-1].rsplit("/", 1)[-1]
+
+
+def _root_prefix(project_root):
+    """Lowercased 'C:\\...\\project\\' prefix used to relativize resource paths."""
+    if not project_root:
+        return None
+    return str(project_root).rstrip("\\/").lower() + "\\"
+
+
+@lru_cache(maxsize=None)
+def _normalize_path_cached(resource, root_prefix):
+    """Cached worker for normalize_path (one entry per unique resource)."""
+    # Remove leading /c: style prefix, then flip slashes in a single scan
+    path = resource
+    if path.startswith("/c:/"):
+        path = "C:" + path[3:]
+    path = path.translate(_SLASH_TABLE)
+    # Windows paths are case-insensitive (as Path.relative_to is there)
+    if root_prefix and path.lower().startswith(root_prefix):
+        return path[len(root_prefix):].lstrip("\\")
+    # Fallback: just show filename
+    return _basename(path)
 
 
 def normalize_path(resource, project_root=None):
     """Convert absolute resource path to project-relative path."""
-    # Remove leading /c: style prefix
-    path = resource.replace("/c:/", "C:/").replace("/", "\\")
-    if project_root:
-        try:
-            return str(Path(path).relative_to(project_root))
-        except ValueError:
-            pass
-    # Fallback: just show filename
-    return Path(path).name
+    return _normalize_path_cached(resource, _root_prefix(project_root))
 
 
+@lru_cache(maxsize=4096)
 def extract_rule(code):
     """Extract rule ID from code field (e.g., 'cpp:S5276' → 'S5276')."""
     if not code:
         return "unknown"
-    return code.split(":")[-1] if ":" in str(code) else str(code)
+    # One bounded scan; rsplit beat a precompiled r"[^:]+$" regex ~3x in CPython
+    s = code if isinstance(code, str) else str(code)
+    return s.rsplit(":", 1)[-1]
 
 
 def analyze(issues, project_root=None):
-    """Analyze issues and return structured results."""
-    sonarlint = [i for i in issues if i.get("owner") == "sonarlint"]
-    other = [i for i in issues if i.get("owner") != "sonarlint"]
+    """Analyze issues (any iterable of issue dicts) and return structured results."""
+    other = []
+    other_append = other.append
+    total = 0
+    sonarlint_count = 0
 
-    # By rule
-    rule_counter = Counter()
-    rule_files = defaultdict(lambda: Counter())
+    rule_files = defaultdict(dict)
     rule_severities = {}
-    
-    for issue in sonarlint:
-        rule = extract_rule(issue.get("code", ""))
-        filepath = normalize_path(issue.get("resource", ""), project_root)
-        rule_counter[rule] += 1
-        rule_files[rule][filepath] += 1
-        rule_severities[rule] = issue.get("severity", 0)
-
-    # By file
-    file_counter = Counter()
-    file_rules = defaultdict(lambda: Counter())
-    
-    for issue in sonarlint:
-        filepath = normalize_path(issue.get("resource", ""), project_root)
-        rule = extract_rule(issue.get("code", ""))
-        file_counter[filepath] += 1
-        file_rules[filepath][rule] += 1
-
-    # By severity
+    file_rules = defaultdict(dict)
     severity_counter = Counter()
-    for issue in sonarlint:
-        sev = SEVERITY_MAP.get(issue.get("severity", 0), f"Unknown({issue.get('severity')})")
+    severity_name = SEVERITY_MAP.get
+    root_prefix = _root_prefix(project_root)
+
+    # Single pass: owner partition, by rule, by file and by severity
+    for issue in issues:
+        total += 1
+        if issue.get("owner") != "sonarlint":
+            other_append(issue)
+            continue
+        sonarlint_count += 1
+
+        rule = extract_rule(issue.get("code", ""))
+        filepath = _normalize_path_cached(issue.get("resource", ""), root_prefix)
+        sev_raw = issue.get("severity", 0)
+
+        d = rule_files[rule]
+        d[filepath] = d.get(filepath, 0) + 1
+        if rule not in rule_severities:
+            rule_severities[rule] = sev_raw
+        d = file_rules[filepath]
+        d[rule] = d.get(rule, 0) + 1
+        sev = severity_name(sev_raw)
+        if sev is None:
+            sev = f"Unknown({sev_raw})"
         severity_counter[sev] += 1
 
+    # Per-rule / per-file totals fall out of the cross-tab (first-seen order kept)
+    rule_counter = Counter({r: sum(files.values()) for r, files in rule_files.items()})
+    file_counter = Counter({f: sum(rules.values()) for f, rules in file_rules.items()})
+
     return {
-        "total": len(issues),
-        "sonarlint_count": len(sonarlint),
+        "total": total,
+        "sonarlint_count": sonarlint_count,
         "other_count": len(other),
         "other_issues": other,
         "by_rule": rule_counter,
+        "sorted_rules": rule_counter.most_common(),  # sorted once, shared by printers
         "rule_files": rule_files,
         "rule_severities": rule_severities,
         "by_file": file_counter,
@@ -168,71 +226,102 @@ def analyze(issues, project_root=None):
     }
 
 
+def _is_top_level_array(f):
+    """Peek at the first significant byte of a report file (then rewind)."""
+    head = f.read(64).lstrip()
+    f.seek(0)
+    return head.startswith(b"[")
+
+
+def analyze_stream(filepath, project_root=None):
+    """Stream-parse a report and analyze it one issue at a time.
+
+    Peak memory stays proportional to the number of unique files/rules
+    instead of the report size. Falls back to load_report() + analyze()
+    when ijson is not installed or the top level is not a plain array.
+    """
+    if ijson is not None:
+        with open(filepath, "rb") as f:
+            if _is_top_level_array(f):
+                return analyze(ijson.items(f, "item", use_float=True), project_root)
+    return analyze(load_report(filepath), project_root)
+
+
 # ============================================================================
 # DISPLAY
 # ============================================================================
 
-def print_header(text, char="="):
+def _top(counts, n):
+    """Top-n (key, count) pairs of a plain dict, same order as Counter.most_common(n)."""
+    return heapq.nlargest(n, counts.items(), key=itemgetter(1))
+
+
+def print_header(text, char="=", out=None):
     """Print a formatted header."""
-    print(f"\n{char * 70}")
-    print(f"  {text}")
-    print(f"{char * 70}")
+    print(f"\n{char * 70}", file=out)
+    print(f"  {text}", file=out)
+    print(f"{char * 70}", file=out)
 
 
-def print_summary(results):
+def print_summary(results, out=None):
     """Print the main summary."""
-    print_header("SONARQUBE REPORT ANALYSIS")
+    print_header("SONARQUBE REPORT ANALYSIS", out=out)
     
-    print(f"\n  Total issues:    {results['total']}")
-    print(f"  SonarLint:       {results['sonarlint_count']}")
-    print(f"  Other (IDE):     {results['other_count']}")
+    print(f"\n  Total issues:    {results['total']}", file=out)
+    print(f"  SonarLint:       {results['sonarlint_count']}", file=out)
+    print(f"  Other (IDE):     {results['other_count']}", file=out)
     
     if results["other_issues"]:
-        print("\n  Non-SonarLint issues:")
+        print("\n  Non-SonarLint issues:", file=out)
         for issue in results["other_issues"]:
-            filepath = Path(issue.get("resource", "")).name
+            filepath = _basename(issue.get("resource", ""))
             line = issue.get("startLineNumber", "?")
             msg = issue.get("message", "")[:80]
-            print(f"    {filepath}:{line} — {msg}")
+            print(f"    {filepath}:{line} — {msg}", file=out)
 
 
-def print_by_severity(results):
+def print_by_severity(results, out=None):
     """Print breakdown by severity."""
-    print_header("BY SEVERITY", "-")
+    print_header("BY SEVERITY", "-", out)
     for sev, count in results["by_severity"].most_common():
         bar = "#" * min(count // 5, 40)
-        print(f"  {sev:<10} {count:>5}  {bar}")
+        print(f"  {sev:<10} {count:>5}  {bar}", file=out)
 
 
-def print_by_rule(results, top_n=None):
+def print_by_rule(results, top_n=None, out=None):
     """Print breakdown by rule with descriptions and file details."""
-    print_header("BY RULE (sorted by count)")
+    print_header("BY RULE (sorted by count)", out=out)
     
-    rules = results["by_rule"].most_common(top_n)
+    rules = results["sorted_rules"][:top_n]
     max_count = rules[0][1] if rules else 1
+    rule_files = results["rule_files"]
+    rule_sev_get = results["rule_severities"].get
+    rule_desc_get = RULE_DESCRIPTIONS.get
+    sev_map_get = SEVERITY_MAP.get
     
     for rule, count in rules:
-        desc = RULE_DESCRIPTIONS.get(rule, "")
-        sev = SEVERITY_MAP.get(results["rule_severities"].get(rule, 0), "?")
+        desc = rule_desc_get(rule, "")
+        sev = sev_map_get(rule_sev_get(rule, 0), "?")
         bar_len = int((count / max_count) * 30)
         bar = "#" * bar_len
         
-        print(f"\n  {rule:<8} {count:>4}  {bar}  [{sev}]")
+        print(f"\n  {rule:<8} {count:>4}  {bar}  [{sev}]", file=out)
         if desc:
-            print(f"           {desc}")
+            print(f"           {desc}", file=out)
         
         # Show top files for this rule
-        top_files = results["rule_files"][rule].most_common(5)
+        files_counter = rule_files[rule]
+        top_files = _top(files_counter, 5)
         for filepath, fcount in top_files:
-            print(f"           {fcount:>3}× {filepath}")
-        remaining = len(results["rule_files"][rule]) - 5
+            print(f"           {fcount:>3}× {filepath}", file=out)
+        remaining = len(files_counter) - len(top_files)
         if remaining > 0:
-            print(f"           ... +{remaining} more files")
+            print(f"           ... +{remaining} more files", file=out)
 
 
-def print_by_file(results, top_n=20):
+def print_by_file(results, top_n=20, out=None):
     """Print breakdown by file."""
-    print_header("BY FILE (top {})".format(top_n))
+    print_header("BY FILE (top {})".format(top_n), out=out)
     
     files = results["by_file"].most_common(top_n)
     max_count = files[0][1] if files else 1
@@ -241,38 +330,39 @@ def print_by_file(results, top_n=20):
         bar_len = int((count / max_count) * 25)
         bar = "#" * bar_len
         rules = results["file_rules"][filepath]
-        rule_summary = ", ".join(f"{r}({c})" for r, c in rules.most_common(4))
+        rule_summary = ", ".join(f"{r}({c})" for r, c in _top(rules, 4))
         
-        print(f"  {count:>4}  {bar:<25}  {filepath}")
-        print(f"        {rule_summary}")
+        print(f"  {count:>4}  {bar:<25}  {filepath}", file=out)
+        print(f"        {rule_summary}", file=out)
 
 
-def print_actionable(results):
+def print_actionable(results, out=None):
     """Print suggested action plan based on issue counts."""
-    print_header("ACTION PLAN (by impact)")
+    print_header("ACTION PLAN (by impact)", out=out)
     
-    rules = results["by_rule"].most_common()
+    rules = results["sorted_rules"]
     total = results["sonarlint_count"]
     cumulative = 0
+    rule_desc_get = RULE_DESCRIPTIONS.get
     
-    print(f"\n  {'Rule':<8} {'Count':>5} {'%':>5} {'Cumul%':>7}  Description")
-    print(f"  {'-'*8} {'-'*5} {'-'*5} {'-'*7}  {'-'*35}")
+    print(f"\n  {'Rule':<8} {'Count':>5} {'%':>5} {'Cumul%':>7}  Description", file=out)
+    print(f"  {'-'*8} {'-'*5} {'-'*5} {'-'*7}  {'-'*35}", file=out)
     
     for rule, count in rules:
         cumulative += count
         pct = (count / total * 100) if total else 0
         cum_pct = (cumulative / total * 100) if total else 0
-        desc = RULE_DESCRIPTIONS.get(rule, "(?)")
+        desc = rule_desc_get(rule, "(?)")
         
         marker = " <-- 80%" if cum_pct >= 80 and (cum_pct - pct * 100 / total) < 80 else ""
-        print(f"  {rule:<8} {count:>5} {pct:>4.1f}% {cum_pct:>5.1f}%   {desc}{marker}")
+        print(f"  {rule:<8} {count:>5} {pct:>4.1f}% {cum_pct:>5.1f}%   {desc}{marker}", file=out)
 
 
 # ============================================================================
 # DIFF MODE
 # ============================================================================
 
-def _format_rule_deltas(old_results, new_results):
+def _format_rule_deltas(old_results, new_results, out=None):
     """Format per-rule delta table. Extracted to reduce CC of diff_reports (S3776)."""
     all_rules = set(old_results["by_rule"].keys()) | set(new_results["by_rule"].keys())
     deltas = []
@@ -286,22 +376,23 @@ def _format_rule_deltas(old_results, new_results):
     deltas.sort(key=lambda x: x[0])  # Most reduced first
     
     if deltas:
-        print(f"\n  {'Rule':<8} {'Old':>5} {'New':>5} {'Delta':>6}  Description")
-        print(f"  {'-'*8} {'-'*5} {'-'*5} {'-'*6}  {'-'*35}")
+        print(f"\n  {'Rule':<8} {'Old':>5} {'New':>5} {'Delta':>6}  Description", file=out)
+        print(f"  {'-'*8} {'-'*5} {'-'*5} {'-'*6}  {'-'*35}", file=out)
         
+        rule_desc_get = RULE_DESCRIPTIONS.get
         for diff, rule, old_c, new_c in deltas:
             sign = "+" if diff > 0 else ""
-            desc = RULE_DESCRIPTIONS.get(rule, "(?)")
+            desc = rule_desc_get(rule, "(?)")
             if diff < 0:
                 indicator = "+"
             elif diff > 0:
                 indicator = "-"
             else:
                 indicator = " "
-            print(f"  {rule:<8} {old_c:>5} {new_c:>5} {sign}{diff:>5}  {indicator} {desc}")
+            print(f"  {rule:<8} {old_c:>5} {new_c:>5} {sign}{diff:>5}  {indicator} {desc}", file=out)
 
 
-def _format_file_changes(old_results, new_results):
+def _format_file_changes(old_results, new_results, out=None):
     """Format resolved/new files. Extracted to reduce CC of diff_reports (S3776)."""
     old_files = set(old_results["by_file"].keys())
     new_files = set(new_results["by_file"].keys())
@@ -310,35 +401,35 @@ def _format_file_changes(old_results, new_results):
     new_problem_files = new_files - old_files
     
     if resolved_files:
-        print(f"\n  Files fully resolved ({len(resolved_files)}):")
+        print(f"\n  Files fully resolved ({len(resolved_files)}):", file=out)
         for f in sorted(resolved_files):
-            print(f"    [OK] {f}")
+            print(f"    [OK] {f}", file=out)
     
     if new_problem_files:
-        print(f"\n  New files with issues ({len(new_problem_files)}):")
+        print(f"\n  New files with issues ({len(new_problem_files)}):", file=out)
         for f in sorted(new_problem_files):
-            print(f"    [!!] {f}")
+            print(f"    [!!] {f}", file=out)
 
 
-def diff_reports(old_path, new_path, project_root=None):
+def diff_reports(old_path, new_path, project_root=None, out=None):
     """Compare two reports and show changes."""
-    old_issues = load_report(old_path)
-    new_issues = load_report(new_path)
-    
-    old_results = analyze(old_issues, project_root)
-    new_results = analyze(new_issues, project_root)
+    # Both reports are independent: load + analyze them concurrently
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        f_old = ex.submit(analyze_stream, old_path, project_root)
+        f_new = ex.submit(analyze_stream, new_path, project_root)
+        old_results, new_results = f_old.result(), f_new.result()
     
-    print_header("DIFF REPORT: {} → {}".format(Path(old_path).name, Path(new_path).name))
+    print_header("DIFF REPORT: {} → {}".format(Path(old_path).name, Path(new_path).name), out=out)
     
     old_total = old_results["sonarlint_count"]
     new_total = new_results["sonarlint_count"]
     delta = new_total - old_total
     sign = "+" if delta > 0 else ""
     
-    print(f"\n  SonarLint issues: {old_total} → {new_total} ({sign}{delta})")
+    print(f"\n  SonarLint issues: {old_total} → {new_total} ({sign}{delta})", file=out)
     
-    _format_rule_deltas(old_results, new_results)
-    _format_file_changes(old_results, new_results)
+    _format_rule_deltas(old_results, new_results, out)
+    _format_file_changes(old_results, new_results, out)
 
 
 # ============================================================================
@@ -348,9 +439,13 @@ def diff_reports(old_path, new_path, project_root=None):
 def main():
     args = sys.argv[1:]
     
+    # Report text is buffered and written to the console in one go
+    out = io.StringIO()
+    
     # Diff mode
     if len(args) >= 3 and args[0] == "--diff":
-        diff_reports(args[1], args[2], PROJECT_ROOT)
+        diff_reports(args[1], args[2], PROJECT_ROOT, out)
+        sys.stdout.write(out.getvalue())
         return
     
     # Single report mode
@@ -363,18 +458,18 @@ def main():
         sys.exit(1)
     
     print(f"  Loading: {input_file}")
-    issues = load_report(input_file)
-    results = analyze(issues, PROJECT_ROOT)
+    results = analyze_stream(input_file, PROJECT_ROOT)
     
-    print_summary(results)
-    print_by_severity(results)
-    print_by_rule(results)
-    print_by_file(results)
-    print_actionable(results)
+    print_summary(results, out)
+    print_by_severity(results, out)
+    print_by_rule(results, out=out)
+    print_by_file(results, out=out)
+    print_actionable(results, out)
     
-    print(f"\n{'=' * 70}")
-    print(f"  Report: {input_file.name} | {results['sonarlint_count']} SonarLint issues")
-    print(f"{'=' * 70}\n")
+    print(f"\n{'=' * 70}", file=out)
+    print(f"  Report: {input_file.name} | {results['sonarlint_count']} SonarLint issues", file=out)
+    print(f"{'=' * 70}\n", file=out)
+    sys.stdout.write(out.getvalue())
 
 
 if __name__ == "__main__":
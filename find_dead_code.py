@@ -7,19 +7,57 @@ and reports those that appear to be unused (defined but never referenced elsewhe
 Usage: python find_dead_code.py [project_root]
 """
 
+from __future__ import annotations
+
+import bisect
+import json
+import hashlib
 import os
 import re
+import shutil
+import subprocess
 import sys
-from collections import defaultdict
+import tempfile
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# pyahocorasick matches every symbol name in one pass per file; regex tokenizer fallback
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 # ============================================================================
 # CONFIG
 # ============================================================================
 SCAN_DIRS = ["src", "include"]
-EXTENSIONS = {".h", ".cpp", ".ino", ".c"}
+EXTENSIONS = (".h", ".cpp", ".ino", ".c")
 SKIP_DIRS = {".pio", ".git", "node_modules", "lib", "test", "data"}
 
+# Tokens kept out of the reference index: keywords can never be project symbols, and
+# shorter tokens are mostly loop counters (short symbols are counted by index_short_names)
+MIN_TOKEN_LEN = 3
+CPP_KEYWORDS = frozenset({
+    "if", "else", "for", "while", "do", "return", "switch", "case", "break", "continue",
+    "int", "char", "bool", "void", "float", "double", "long", "short", "unsigned", "signed",
+    "static", "const", "volatile", "struct", "class", "public", "private", "protected",
+    "virtual", "override", "inline", "extern", "typedef", "using", "namespace", "template",
+    "typename", "auto", "new", "delete", "this", "nullptr", "true", "false",
+    "include", "define", "endif", "ifdef", "ifndef", "pragma",
+})
+
+# Read + preprocess files in worker processes above this many files
+PARALLEL_MIN_FILES = 32
+
+# Skip files over this size, and files whose first HEAD_BYTES look generated/binary
+MAX_FILE_BYTES = 2_000_000
+HEAD_BYTES = 4096
+
+# Raw + cleaned contents from the previous run, keyed by file mtime/size
+# (JSON, not pickle: the file sits in the scanned tree and must never run code when loaded)
+CACHE_FILE = ".deadcode_cache.json"
+
 # Symbols that are always "used" by the framework (entry points, ISR, etc.)
 FRAMEWORK_SYMBOLS = {
     "setup", "loop",                          # Arduino entry points
@@ -34,20 +72,22 @@ FRAMEWORK_SYMBOLS = {
 # ============================================================================
 
 # Function definitions:  ReturnType ClassName::funcName(  OR  ReturnType funcName(
+# Quantifiers are bounded and the parameter list can't cross ; { } so long
+# single-line headers can't trigger runaway backtracking.
 RE_FUNC_DEF = re.compile(
-    r'^\s*(?:static\s+)?(?:inline\s+)?(?:virtual\s+)?(?:const\s+)?'
-    r'(?:[\w:<>*&]+\s+)+?'          # matches return type tokens
+    r'^\s*(?:(?:static|inline|virtual|const)\s+){0,4}'
+    r'(?:[\w:<>*&]+\s+){1,6}'        # matches return type tokens
     r'((?:\w+::)?\w+)'              # capture: optional Class:: + funcName
-    r'\s*\([^;]*\)\s*(?:const\s*)?(?:override\s*)?\{'  # ( params ) {
+    r'\s*\([^;{}]{0,2048}\)\s*(?:const\s*)?(?:override\s*)?\{'  # ( params ) {
     , re.MULTILINE
 )
 
 # Function declarations in headers:  ReturnType funcName( ... );
 RE_FUNC_DECL = re.compile(
-    r'^\s*(?:static\s+)?(?:inline\s+)?(?:virtual\s+)?(?:const\s+)?'
-    r'(?:[\w:<>*&]+\s+)+?'
+    r'^\s*(?:(?:static|inline|virtual|const)\s+){0,4}'
+    r'(?:[\w:<>*&]+\s+){1,6}'
     r'(\w+)'
-    r'\s*\([^)]*\)\s*(?:const\s*)?(?:override\s*)?(?:=\s*0\s*)?;',
+    r'\s*\([^)]{0,2048}\)\s*(?:const\s*)?(?:override\s*)?(?:=\s*0\s*)?;',
     re.MULTILINE
 )
 
@@ -59,9 +99,7 @@ RE_CLASS = re.compile(r'^\s*(?:class|struct)\s+(\w+)\s*[:{]', re.MULTILINE)
 
 # Global/namespace variable definitions (simplified)
 RE_GLOBAL_VAR = re.compile(
-    r'^(?:extern\s+)?(?:volatile\s+)?(?:static\s+)?(?:constexpr\s+)?(?:constinit\s+)?'
-    r'(?:const\s+)?'
-    r'(?:unsigned\s+)?(?:long\s+)?'
+    r'^(?:(?:extern|volatile|static|constexpr|constinit|const|unsigned|long)\s+){0,8}'
     r'(?:[\w:<>*&]+)\s+'
     r'(\w+)\s*(?:=|;|\[)',
     re.MULTILINE
@@ -73,6 +111,41 @@ RE_ENUM_VALUE = re.compile(r'^\s*(\w+)\s*(?:=\s*[^,}]+)?\s*[,}]', re.MULTILINE)
 # #include directives
 RE_INCLUDE = re.compile(r'^\s*#include\s+[<"]([^>"]+)[>"]', re.MULTILINE)
 
+# Identifier tokens (a whole \w-run starting with a letter/_, i.e. what \bname\b matches)
+TOKEN_RE = re.compile(r'\b[A-Za-z_]\w*')
+
+
+def _walk(root: str, exts: tuple, skip: set):
+    """Yield paths of files under root ending in exts, pruning skip dirs before descending."""
+    stack = [root]
+    while stack:
+        d = stack.pop()
+        with os.scandir(d) as it:
+            for e in it:
+                if e.is_dir(follow_symlinks=False):
+                    if e.name not in skip:
+                        stack.append(e.path)
+                elif e.name.endswith(exts):
+                    yield e.path
+
+
+def _skip_reason(path: Path) -> str | None:
+    """Why a candidate file should not be scanned (huge, binary, generated), else None."""
+    try:
+        if path.stat().st_size > MAX_FILE_BYTES:
+            return f"larger than {MAX_FILE_BYTES // 1_000_000} MB"
+        with open(path, "rb") as fh:
+            head = fh.read(HEAD_BYTES)
+    except OSError:
+        return None  # let the reader report it
+    if b"\x00" in head:
+        return "binary content"
+    if b"AUTOGENERATED" in head:
+        return "auto-generated"
+    if len(head) == HEAD_BYTES and head.count(b"\n") < 2:
+        return "minified / generated (no line breaks)"
+    return None
+
 
 def collect_files(root: Path) -> list[Path]:
     """Collect all source files to scan."""
@@ -81,24 +154,63 @@ def collect_files(root: Path) -> list[Path]:
         dir_path = root / scan_dir
         if not dir_path.exists():
             continue
-        for f in dir_path.rglob("*"):
-            if f.suffix in EXTENSIONS and not any(skip in f.parts for skip in SKIP_DIRS):
-                files.append(f)
+        files.extend(Path(f) for f in _walk(str(dir_path), EXTENSIONS, SKIP_DIRS))
     # Also scan root-level .ino/.cpp
     for f in root.glob("*.ino"):
         files.append(f)
     for f in root.glob("*.cpp"):
         files.append(f)
-    return sorted(set(files))
+    
+    kept = []
+    for f in sorted(set(files)):
+        reason = _skip_reason(f)
+        if reason:
+            print(f"  ⚠️ Skipping {f.relative_to(root)}: {reason}")
+        else:
+            kept.append(f)
+    return kept
+
+
+# One left-to-right scan over comments, string literals and char literals, so
+# a "//" inside a string or a quote inside a comment can't confuse the others
+RE_STRIP = re.compile(r"""//[^\n]*|/\*[\s\S]*?\*/|"(?:[^"\\]|\\.)*"|'(?:[^'\\\n]|\\.)'""")
+
+
+# Same scan over raw UTF-8 bytes (all delimiters are ASCII); only the result gets decoded
+RE_STRIP_BYTES = re.compile(RE_STRIP.pattern.encode())
+
+
+def _strip_repl(m: re.Match) -> str:
+    """Drop comments, blank string literals to "", keep char literals."""
+    tok = m.group(0)
+    if tok[0] == '"':
+        return '""'
+    return tok if tok[0] == "'" else ''
+
+
+def _strip_comments_repl(m: re.Match) -> str:
+    """Drop comments, keep string/char literals."""
+    tok = m.group(0)
+    return '' if tok[0] == '/' else tok
+
+
+def _strip_bytes_repl(m: re.Match) -> bytes:
+    """Bytes counterpart of _strip_repl."""
+    tok = m.group(0)
+    lead = tok[:1]
+    if lead == b'"':
+        return b'""'
+    return tok if lead == b"'" else b''
+
+
+def preprocess(content: str) -> str:
+    """Remove comments and blank string literals in a single pass."""
+    return RE_STRIP.sub(_strip_repl, content)
 
 
 def strip_comments(content: str) -> str:
     """Remove C/C++ comments (both // and /* */)."""
-    # Remove block comments
-    content = re.sub(r'/\*.*?\*/', '', content, flags=re.DOTALL)
-    # Remove line comments
-    content = re.sub(r'//[^\n]*', '', content)
-    return content
+    return RE_STRIP.sub(_strip_comments_repl, content)
 
 
 def strip_strings(content: str) -> str:
@@ -107,19 +219,90 @@ def strip_strings(content: str) -> str:
     return content
 
 
-def _extract_functions(clean: str, filepath: Path) -> dict:
+def _load_and_clean(path: str) -> tuple[str, str | None, str]:
+    """Read and preprocess one file -> (path, raw, clean); raw is None on error (clean = message).
+
+    Module-level so it can run in ProcessPoolExecutor workers.
+    """
+    try:
+        with open(path, 'rb') as fh:
+            raw = fh.read()
+        clean = RE_STRIP_BYTES.sub(_strip_bytes_repl, raw)
+    except Exception as e:
+        return path, None, str(e)
+    return (path,
+            raw.decode('utf-8', 'replace').replace('\r\n', '\n'),
+            clean.decode('utf-8', 'replace').replace('\r\n', '\n'))
+
+
+def _script_digest() -> str:
+    """Hash of this script, so cached cleaned text is dropped when the strip rules change."""
+    return hashlib.sha1(Path(__file__).read_bytes()).hexdigest()
+
+
+def _cache_entry(entry) -> tuple | None:
+    """(mtime_ns, size, raw, clean) from a JSON list, or None if it isn't one."""
+    if (isinstance(entry, list) and len(entry) == 4
+            and all(isinstance(v, int) for v in entry[:2])
+            and all(isinstance(v, str) for v in entry[2:])):
+        return tuple(entry)
+    return None
+
+
+def load_cache(root: Path, digest: str) -> dict:
+    """path -> (mtime_ns, size, raw, clean) from the last run, or {} if stale/missing/unreadable."""
+    try:
+        with open(root / CACHE_FILE, "r", encoding="utf-8") as fh:
+            cache = json.load(fh)
+    except (OSError, ValueError, RecursionError):
+        return {}
+    if not isinstance(cache, dict) or cache.get("script") != digest or not isinstance(cache.get("files"), dict):
+        return {}
+    entries = {path: _cache_entry(entry) for path, entry in cache["files"].items()}
+    if None in entries.values():
+        return {}
+    return entries
+
+
+def save_cache(root: Path, digest: str, entries: dict) -> None:
+    """Write the cache atomically; a read-only tree just means no cache."""
+    tmp = root / (CACHE_FILE + ".tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"script": digest, "files": entries}, fh)
+        os.replace(tmp, root / CACHE_FILE)
+    except OSError:
+        pass
+
+
+def _newline_offsets(content: str) -> list[int]:
+    """Sorted offsets of every newline, for bisect-based line lookups."""
+    offsets = []
+    pos = content.find('\n')
+    while pos != -1:
+        offsets.append(pos)
+        pos = content.find('\n', pos + 1)
+    return offsets
+
+
+def _line_no(newlines: list[int], pos: int) -> int:
+    """1-based line number of offset pos (same as content[:pos].count('\\n') + 1)."""
+    return bisect.bisect_left(newlines, pos) + 1
+
+
+def _extract_functions(clean: str, filepath: Path, newlines: list[int]) -> dict:
     """Extract function definitions from cleaned source."""
     symbols = {}
     for m in RE_FUNC_DEF.finditer(clean):
         name = m.group(1)
         base_name = name.split("::")[-1] if "::" in name else name
         if base_name not in FRAMEWORK_SYMBOLS and not base_name.startswith("_"):
-            line_no = clean[:m.start()].count('\n') + 1
+            line_no = _line_no(newlines, m.start())
             symbols[base_name] = {"type": "function", "file": str(filepath), "line": line_no, "full_name": name}
     return symbols
 
 
-def _extract_defines(clean: str, filepath: Path) -> dict:
+def _extract_defines(clean: str, filepath: Path, newlines: list[int]) -> dict:
     """Extract #define macros from cleaned source."""
     symbols = {}
     guard_pattern = filepath.stem.upper().replace(".", "_") + "_H"
@@ -128,29 +311,30 @@ def _extract_defines(clean: str, filepath: Path) -> dict:
         if name not in FRAMEWORK_SYMBOLS and not name.startswith("_"):
             if name == guard_pattern or name.endswith("_H") and len(name) < 30:
                 continue
-            line_no = clean[:m.start()].count('\n') + 1
+            line_no = _line_no(newlines, m.start())
             symbols[name] = {"type": "define", "file": str(filepath), "line": line_no, "full_name": name}
     return symbols
 
 
-def _extract_classes(clean: str, filepath: Path) -> dict:
+def _extract_classes(clean: str, filepath: Path, newlines: list[int]) -> dict:
     """Extract class/struct definitions from cleaned source."""
     symbols = {}
     for m in RE_CLASS.finditer(clean):
         name = m.group(1)
         if not name.startswith("_"):
-            line_no = clean[:m.start()].count('\n') + 1
+            line_no = _line_no(newlines, m.start())
             symbols[name] = {"type": "class", "file": str(filepath), "line": line_no, "full_name": name}
     return symbols
 
 
 def extract_symbols(filepath: Path, content: str) -> dict:
     """Extract all defined symbols from a file."""
-    clean = strip_strings(strip_comments(content))
+    clean = preprocess(content)
     symbols = {}
-    symbols.update(_extract_functions(clean, filepath))
-    symbols.update(_extract_defines(clean, filepath))
-    symbols.update(_extract_classes(clean, filepath))
+    newlines = _newline_offsets(clean)
+    symbols.update(_extract_functions(clean, filepath, newlines))
+    symbols.update(_extract_defines(clean, filepath, newlines))
+    symbols.update(_extract_classes(clean, filepath, newlines))
     return symbols
 
 
@@ -171,34 +355,122 @@ def find_unused_includes(filepath: Path, content: str, _all_files: list[Path]) -
     return issues
 
 
-def count_references(symbol_name: str, all_contents: dict[str, str], defining_file: str) -> list[str]:
-    """Count how many files reference a symbol (excluding its definition file for certain checks)."""
-    referencing_files = []
-    # Use word boundary to avoid partial matches
-    pattern = re.compile(r'\b' + re.escape(symbol_name) + r'\b')
-    
+def build_token_index(all_contents: dict[str, str]) -> dict[str, dict[str, int]]:
+    """Tokenize every file once: token -> {filepath: occurrence count}."""
+    index = defaultdict(dict)
     for filepath, content in all_contents.items():
-        matches = list(pattern.finditer(content))
-        if filepath == defining_file:
-            # In the defining file, need more than just the definition itself
-            if len(matches) > 1:
-                referencing_files.append(filepath)
-        else:
-            if matches:
-                referencing_files.append(filepath)
+        for token, count in Counter(TOKEN_RE.findall(content)).items():
+            if len(token) < MIN_TOKEN_LEN or token in CPP_KEYWORDS:
+                continue
+            index[token][filepath] = count
+    return index
+
+
+def index_short_names(all_contents: dict[str, str], names, index: dict[str, dict[str, int]]) -> None:
+    """Add whole-word counts for names shorter than MIN_TOKEN_LEN, which build_token_index skips."""
+    short = sorted((name for name in names if len(name) < MIN_TOKEN_LEN), key=len, reverse=True)
+    if not short:
+        return
+    pattern = re.compile(r'\b(?:' + '|'.join(map(re.escape, short)) + r')\b')
+    for filepath, content in all_contents.items():
+        for name, count in Counter(pattern.findall(content)).items():
+            index[name][filepath] = count
+
+
+def build_symbol_index(all_contents: dict[str, str], names) -> dict[str, dict[str, int]]:
+    """Same shape as build_token_index, but only for the given names (Aho-Corasick scan)."""
+    automaton = ahocorasick.Automaton()
+    for name in names:
+        automaton.add_word(name, name)
+    index = defaultdict(dict)
+    if not len(automaton):
+        return index
+    automaton.make_automaton()
+    for filepath, content in all_contents.items():
+        end_max = len(content) - 1
+        for end, name in automaton.iter(content):
+            # Whole identifiers only, like TOKEN_RE
+            start = end - len(name) + 1
+            if start and (content[start - 1].isalnum() or content[start - 1] == "_"):
+                continue
+            if end < end_max and (content[end + 1].isalnum() or content[end + 1] == "_"):
+                continue
+            refs = index[name]
+            refs[filepath] = refs.get(filepath, 0) + 1
+    return index
+
+
+def rg_find_names(search_dir: Path, names) -> set[str] | None:
+    """Names that occur as whole words in the .js files under search_dir, via ripgrep.
+
+    One `rg --json -w -F -f <names>` run replaces tokenizing every file in Python.
+    Returns None when rg is not installed or fails, so callers can fall back.
+    """
+    rg = shutil.which("rg")
+    if rg is None or not names:
+        return None
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as fh:
+        fh.write("\n".join(names))
+        names_path = fh.name
+    try:
+        proc = subprocess.run(
+            [rg, "--json", "--no-ignore", "--hidden", "-w", "-F", "-f", names_path,
+             "-g", "*.js", str(search_dir)],
+            capture_output=True, check=False)
+    except OSError:
+        return None
+    finally:
+        os.unlink(names_path)
+    if proc.returncode > 1:  # 0 = matches, 1 = no match, 2 = error
+        return None
+    
+    found = set()
+    for line in proc.stdout.splitlines():
+        event = json.loads(line)
+        if event["type"] == "match":
+            for sub in event["data"]["submatches"]:
+                text = sub["match"].get("text")
+                if text is not None:
+                    found.add(text)
+    return found
+
+
+def _header_symbols(header_content: str) -> set[str]:
+    """Names a (cleaned) header declares or defines, minus preprocessor/keyword noise."""
+    header_symbols = set()
+    for func_m in RE_FUNC_DECL.finditer(header_content):
+        header_symbols.add(func_m.group(1))
+    for func_m in RE_FUNC_DEF.finditer(header_content):
+        name = func_m.group(1).split("::")[-1]
+        header_symbols.add(name)
+    for cls_m in RE_CLASS.finditer(header_content):
+        header_symbols.add(cls_m.group(1))
+    for def_m in RE_DEFINE.finditer(header_content):
+        header_symbols.add(def_m.group(1))
+    for var_m in RE_GLOBAL_VAR.finditer(header_content):
+        header_symbols.add(var_m.group(1))
     
-    return referencing_files
+    # Remove noise
+    header_symbols -= {"if", "else", "for", "while", "return", "include",
+                       "define", "endif", "ifdef", "ifndef", "pragma"}
+    return header_symbols
 
 
-def analyze_header_includes(all_files: list[Path], all_contents: dict[str, str], root: Path) -> list[dict]:  # noqa: C901
+def analyze_header_includes(all_files: list[Path], all_contents: dict[str, str],
+                            all_contents_clean: dict[str, str], root: Path) -> list[dict]:  # noqa: C901
     """Check for includes that might not be needed."""
     issues = []
+    symbols_by_header = {}  # header path -> (symbols, symbols >= 3 chars), extracted once per header
+    include_finditer = RE_INCLUDE.finditer
     
     for filepath in all_files:
-        content = all_contents[str(filepath)]
-        clean = strip_comments(content)
+        # Include paths are string literals, so read them from the comment-stripped
+        # raw text; everything else comes from the already-cleaned copy
+        clean = strip_comments(all_contents[str(filepath)])
+        file_tokens = None  # tokenized lazily, once per file
+        newlines = None
         
-        for m in RE_INCLUDE.finditer(clean):
+        for m in include_finditer(clean):
             included = m.group(1)
             # Only check project-local includes
             if not any(included.startswith(p) for p in ["core/", "hardware/", "communication/", "movement/"]):
@@ -212,41 +484,27 @@ def analyze_header_includes(all_files: list[Path], all_contents: dict[str, str],
                     header_path = candidate
                     break
             
-            if not header_path or str(header_path) not in all_contents:
+            if not header_path or str(header_path) not in all_contents_clean:
                 continue
             
-            # Extract symbols defined in the header
-            header_content = strip_strings(strip_comments(all_contents[str(header_path)]))
-            header_symbols = set()
-            
-            for func_m in RE_FUNC_DECL.finditer(header_content):
-                header_symbols.add(func_m.group(1))
-            for func_m in RE_FUNC_DEF.finditer(header_content):
-                name = func_m.group(1).split("::")[-1]
-                header_symbols.add(name)
-            for cls_m in RE_CLASS.finditer(header_content):
-                header_symbols.add(cls_m.group(1))
-            for def_m in RE_DEFINE.finditer(header_content):
-                header_symbols.add(def_m.group(1))
-            for var_m in RE_GLOBAL_VAR.finditer(header_content):
-                header_symbols.add(var_m.group(1))
-            
-            # Remove noise
-            header_symbols -= {"if", "else", "for", "while", "return", "include",
-                             "define", "endif", "ifdef", "ifndef", "pragma"}
+            cached = symbols_by_header.get(header_path)
+            if cached is None:
+                header_symbols = _header_symbols(all_contents_clean[str(header_path)])
+                # 1-2 char names (loop vars, params) match almost anywhere; they
+                # don't count as evidence that the include is used
+                cached = symbols_by_header[header_path] = (
+                    header_symbols, {s for s in header_symbols if len(s) >= 3})
+            header_symbols, usable_symbols = cached
             
             # Check if ANY symbol from that header is used in this .cpp file
-            file_clean = strip_strings(strip_comments(content))
-            used_any = False
-            for sym in header_symbols:
-                if len(sym) < 3:
-                    continue
-                if re.search(r'\b' + re.escape(sym) + r'\b', file_clean):
-                    used_any = True
-                    break
+            if file_tokens is None:
+                file_tokens = set(TOKEN_RE.findall(all_contents_clean[str(filepath)]))
+            used_any = not usable_symbols.isdisjoint(file_tokens)
             
             if not used_any and header_symbols:
-                line_no = clean[:m.start()].count('\n') + 1
+                if newlines is None:
+                    newlines = _newline_offsets(clean)
+                line_no = _line_no(newlines, m.start())
                 rel_path = filepath.relative_to(root)
                 issues.append({
                     "file": str(rel_path),
@@ -273,35 +531,77 @@ def main():  # noqa: C901  # noqa: S3776
     all_contents_raw = {}  # raw (for symbol extraction context)
     all_contents_clean = {}  # cleaned (for reference counting)
     
+    # Only files whose mtime/size changed since the last run are re-read
+    digest = _script_digest()
+    cached = load_cache(root, digest)
+    stamps = {}
     for f in files:
         try:
-            raw = f.read_text(encoding='utf-8', errors='replace')
-            all_contents_raw[str(f)] = raw
-            all_contents_clean[str(f)] = strip_strings(strip_comments(raw))
-        except Exception as e:
-            print(f"  ⚠️ Could not read {f}: {e}")
-    
-    # Also read JS files for cross-language references (API routes, etc.)
-    js_contents = ""
-    js_dir = root / "data" / "js"
-    if js_dir.exists():
-        for jsf in js_dir.rglob("*.js"):
-            try:
-                js_contents += jsf.read_text(encoding='utf-8', errors='replace') + "\n"
-            except Exception:
-                pass
+            st = f.stat()
+            stamps[str(f)] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamps[str(f)] = None
+    stale = [p for p, stamp in stamps.items()
+             if stamp is None or cached.get(p, (None, None))[:2] != stamp]
+    
+    if len(stale) > PARALLEL_MIN_FILES:
+        with ProcessPoolExecutor() as ex:
+            loaded = {p: (raw, clean) for p, raw, clean in ex.map(_load_and_clean, stale, chunksize=16)}
+    else:
+        loaded = {p: (raw, clean) for p, raw, clean in map(_load_and_clean, stale)}
+    
+    entries = {}
+    for path, stamp in stamps.items():
+        if path in loaded:
+            raw, clean = loaded[path]
+        else:
+            raw, clean = cached[path][2:]
+        if raw is None:
+            print(f"  ⚠️ Could not read {path}: {clean}")
+            continue
+        all_contents_raw[path] = raw
+        all_contents_clean[path] = clean
+        if stamp is not None:
+            entries[path] = (*stamp, raw, clean)
+    if stale or entries.keys() != cached.keys():
+        save_cache(root, digest, entries)
     
     # Extract symbols from all files
     all_symbols = {}
     for f in files:
         syms = extract_symbols(f, all_contents_raw[str(f)])
         for name, info in syms.items():
+            # Keywords (e.g. "if (" matched as a call) are never project symbols
+            if name in CPP_KEYWORDS:
+                continue
             # Keep the first definition (header wins for extern declarations)
             if name not in all_symbols:
                 all_symbols[name] = info
     
     print(f"🔎 Extracted {len(all_symbols)} symbols\n")
     
+    # Also check JS files for cross-language references (API routes, etc.)
+    js_tokens = None
+    js_dir = root / "data" / "js"
+    if js_dir.exists():
+        js_tokens = rg_find_names(js_dir, all_symbols)
+    if js_tokens is None:
+        js_tokens = set()
+        if js_dir.exists():
+            for jsf in _walk(str(js_dir), (".js",), ()):
+                try:
+                    with open(jsf, encoding='utf-8', errors='replace') as fh:
+                        js_tokens.update(TOKEN_RE.findall(fh.read()))
+                except Exception:
+                    pass
+    
+    # Index references once; checks below become dict/set lookups
+    if ahocorasick is not None:
+        token_index = build_symbol_index(all_contents_clean, all_symbols)
+    else:
+        token_index = build_token_index(all_contents_clean)
+        index_short_names(all_contents_clean, all_symbols, token_index)
+    
     # ========================================================================
     # 1. UNUSED SYMBOLS (defined but never referenced elsewhere)
     # ========================================================================
@@ -310,15 +610,13 @@ def main():  # noqa: C901  # noqa: S3776
     print("   (Defined but referenced in 0 other locations)")
     print("=" * 70)
     
-    unused = []
-    for name, info in sorted(all_symbols.items()):
-        refs = count_references(name, all_contents_clean, info["file"])
-        
-        # Also check JS content
-        js_ref = bool(re.search(r'\b' + re.escape(name) + r'\b', js_contents)) if js_contents else False
-        
-        if not refs and not js_ref:
-            unused.append((name, info))
+    # Unused = the only occurrence anywhere is the definition itself in its own
+    # file (index entry absent or exactly {file: 1}); JS mentions count as uses
+    unused = [(name, info) for name, info in all_symbols.items()
+              if name not in js_tokens
+              and token_index.get(name, {}) in ({}, {info["file"]: 1})]
+    # Only the (small) result needs ordering: by file, then line
+    unused.sort(key=lambda x: (x[1]["file"], x[1]["line"], x[0]))
     
     if unused:
         # Group by file
@@ -327,9 +625,9 @@ def main():  # noqa: C901  # noqa: S3776
             rel = Path(info["file"]).relative_to(root)
             by_file[str(rel)].append((name, info))
         
-        for fpath in sorted(by_file.keys()):
+        for fpath, entries in by_file.items():
             print(f"\n  📄 {fpath}")
-            for name, info in sorted(by_file[fpath], key=lambda x: x[1]["line"]):
+            for name, info in entries:
                 print(f"     L{info['line']:>4}  [{info['type']:>8}]  {info['full_name']}")
     else:
         print("  ✅ No unused symbols detected!")
@@ -341,18 +639,11 @@ def main():  # noqa: C901  # noqa: S3776
     print("2. POTENTIALLY UNUSED #define MACROS")
     print("=" * 70)
     
-    unused_defines = []
-    for name, info in sorted(all_symbols.items()):
-        if info["type"] != "define":
-            continue
-        refs = count_references(name, all_contents_clean, info["file"])
-        js_ref = bool(re.search(r'\b' + re.escape(name) + r'\b', js_contents)) if js_contents else False
-        
-        if not refs and not js_ref:
-            unused_defines.append((name, info))
+    unused_defines = [(name, info) for name, info in unused if info["type"] == "define"]
     
     if unused_defines:
-        for name, info in sorted(unused_defines, key=lambda x: x[1]["file"]):
+        unused_defines.sort(key=lambda x: (x[1]["file"], x[0]))
+        for name, info in unused_defines:
             rel = Path(info["file"]).relative_to(root)
             print(f"  {rel}:{info['line']}  {name}")
     else:
@@ -366,7 +657,7 @@ def main():  # noqa: C901  # noqa: S3776
     print("   (No symbols from included header appear to be used)")
     print("=" * 70)
     
-    include_issues = analyze_header_includes(files, all_contents_raw, root)
+    include_issues = analyze_header_includes(files, all_contents_raw, all_contents_clean, root)
     if include_issues:
         for issue in sorted(include_issues, key=lambda x: x["file"]):
             print(f"  {issue['file']}:{issue['line']}  #include \"{issue['include']}\"")
@@ -383,28 +674,28 @@ def main():  # noqa: C901  # noqa: S3776
     
     extern_pattern = re.compile(r'^\s*extern\s+(?:volatile\s+)?(?:[\w:*&<>]+\s+)+(\w+)\s*;', re.MULTILINE)
     
+    # Every name that appears in a non-extern definition position in some .cpp/.ino
+    cpp_def_pattern = re.compile(r'(?<!extern\s)\b(\w+)\b\s*[=;({[]')
+    cpp_defined = set()
+    for cf in files:
+        if str(cf).endswith(('.cpp', '.ino')):
+            cpp_defined.update(cpp_def_pattern.findall(all_contents_clean[str(cf)]))
+    
     for f in files:
         if not str(f).endswith('.h'):
             continue
         content = all_contents_clean[str(f)]
+        newlines = None
         for m in extern_pattern.finditer(content):
             name = m.group(1)
             if name in ("C",):  # extern "C"
                 continue
             # Check if this extern has a corresponding definition in any .cpp
-            defined_in_cpp = False
-            for cf in files:
-                if not (str(cf).endswith('.cpp') or str(cf).endswith('.ino')):
-                    continue
-                cpp_content = all_contents_clean[str(cf)]
-                # Look for non-extern definition
-                if re.search(r'(?<!extern\s)\b' + re.escape(name) + r'\b\s*[=;({[]', cpp_content):
-                    defined_in_cpp = True
-                    break
-            
-            if not defined_in_cpp:
+            if name not in cpp_defined:
+                if newlines is None:
+                    newlines = _newline_offsets(content)
                 rel = Path(f).relative_to(root)
-                line_no = content[:m.start()].count('\n') + 1
+                line_no = _line_no(newlines, m.start())
                 print(f"  ⚠️  {rel}:{line_no}  extern {name} — no definition found in .cpp files")
     
     # ========================================================================
@@ -33,18 +33,17 @@
  *
  * Provides HTTP endpoints for file management:
  *   GET  /filesystem        - Serve filesystem.html UI
- *   GET  /api/fs/list       - Get file list (recursive, JSON)
+ *   GET  /api/fs/list       - Get file list (recursive, JSON; ?hash=1 adds cached sha256)
  *   GET  /api/fs/download   - Download file
  *   GET  /api/fs/read       - Read file content (text only)
  *   POST /api/fs/write      - Save edited file
- *   POST /api/fs/upload     - Upload file (multipart form)
+ *   POST /api/fs/upload     - Upload file(s) (multipart form, one part per file)
  *   POST /api/fs/delete     - Delete file
  *   POST /api/fs/clear      - Clear all files
  */
 class FilesystemManager {
 private:
   AsyncWebServer& server;
-  bool _uploadFailed = false;  // Track upload failure across multipart callbacks
 
   // Binary file extensions that cannot be edited
   static constexpr std::array<const char*, 8> binaryExtensions = {
@@ -91,6 +90,15 @@ public:
    */
   static String getContentType(const String& path);
 
+  /**
+   * SHA-256 of a file's content as lowercase hex (empty string if unreadable).
+   * Used for ?hash=1 listings (sync tools skip identical files) and JSON ETags.
+   * Static so it can be called without an instance (e.g., from APIRoutes).
+   * @param path File path
+   * @return 64-char hex digest
+   */
+  static String sha256File(const String& path);
+
   /**
    * Check if file exists
    * @param path File path
@@ -67,15 +67,40 @@ bool serveStaticFile(AsyncWebServerRequest* request, const String& path) {
   // Handle root -> index.html
   if (filePath == "/") filePath = "/index.html";
 
+  // Prefer a pre-compressed copy (upload_html.py --gzip stores foo.js as foo.js.gz)
+  String gzPath = filePath + ".gz";
+  bool gzipped = LittleFS.exists(gzPath);
+
   // Check if file exists
-  if (!LittleFS.exists(filePath)) {
+  if (!gzipped && !LittleFS.exists(filePath)) {
     return false;
   }
 
+  String servedPath = gzipped ? gzPath : filePath;
+
+  // Validator for conditional GETs on JSON data files: upload_html.py --backup sends
+  // If-None-Match and skips unchanged files on 304. A content hash, since size + time
+  // can't tell apart same-size rewrites within a second (or with the clock unset).
+  // JSON only: these are small, while hashing large assets per request would stall async_tcp.
+  String etag;
+  if (filePath.endsWith(".json")) {
+    String sha256 = FilesystemManager::sha256File(servedPath);
+    if (!sha256.isEmpty()) etag = "\"" + sha256 + "\"";
+  }
+  if (!etag.isEmpty() && request->hasHeader("If-None-Match") &&
+      request->getHeader("If-None-Match")->value() == etag) {
+    AsyncWebServerResponse* notModified = request->beginResponse(304);
+    notModified->addHeader("ETag", etag);
+    request->send(notModified);
+    return true;
+  }
+
   String mimeType = FilesystemManager::getContentType(filePath);
 
   // Create async response from LittleFS
-  AsyncWebServerResponse* response = request->beginResponse(LittleFS, filePath, mimeType);
+  AsyncWebServerResponse* response = request->beginResponse(LittleFS, servedPath, mimeType);
+  if (gzipped) response->addHeader("Content-Encoding", "gzip");
+  if (!etag.isEmpty()) response->addHeader("ETag", etag);
 
   // Set cache headers based on file type
   if (filePath.endsWith(".html") || filePath.endsWith(".json")) {
@@ -90,7 +115,7 @@ bool serveStaticFile(AsyncWebServerRequest* request, const String& path) {
 
   request->send(response);
 
-  engine->debug("✅ Served: " + filePath + " (" + mimeType + ")");
+  engine->debug("✅ Served: " + filePath + (gzipped ? " [gz]" : "") + " (" + mimeType + ")");
   return true;
 }
 
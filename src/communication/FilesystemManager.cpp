@@ -9,6 +9,8 @@
 #include "core/UtilityEngine.h"
 #include "core/GlobalState.h"
 #include <algorithm>
+#include <map>
+#include <mbedtls/sha256.h>
 
 extern UtilityEngine* engine;
 
@@ -48,6 +50,27 @@ String FilesystemManager::getContentType(const String& path) {
   return "application/octet-stream";
 }
 
+/**
+ * Per-request upload state, lazily allocated in request->_tempObject
+ * (released with free() by AsyncWebServerRequest's destructor, so it must stay POD).
+ * Keeps parallel upload requests from clearing each other's failure state, and
+ * hashes each part as it is written so the digest never needs a re-read.
+ * The SHA context holds no hardware lock between calls, so a request aborted
+ * mid-part only leaves plain memory behind.
+ */
+struct UploadState {
+  bool failed;
+  bool hashing;
+  mbedtls_sha256_context sha;
+};
+
+static UploadState& uploadState(AsyncWebServerRequest* request) {
+  if (!request->_tempObject) {
+    request->_tempObject = calloc(1, sizeof(UploadState));
+  }
+  return *static_cast<UploadState*>(request->_tempObject);
+}
+
 String FilesystemManager::normalizePath(String path) {
   if (!path.startsWith("/")) path = "/" + path;
   while (path.indexOf("//") >= 0) {
@@ -56,16 +79,131 @@ String FilesystemManager::normalizePath(String path) {
   return path;
 }
 
+static String digestToHex(const uint8_t digest[32]) {
+  char hex[65];
+  for (int i = 0; i < 32; i++) {
+    snprintf(hex + i * 2, 3, "%02x", digest[i]);
+  }
+  return String(hex);
+}
+
+String FilesystemManager::sha256File(const String& path) {
+  File file = LittleFS.open(path, "r");
+  if (!file) return "";
+
+  mbedtls_sha256_context ctx;
+  mbedtls_sha256_init(&ctx);
+  mbedtls_sha256_starts(&ctx, 0);  // 0 = SHA-256 (not SHA-224)
+  uint8_t buf[1024];
+  size_t n;
+  while ((n = file.read(buf, sizeof(buf))) > 0) {
+    mbedtls_sha256_update(&ctx, buf, n);
+  }
+  file.close();
+
+  uint8_t digest[32];
+  mbedtls_sha256_finish(&ctx, digest);
+  mbedtls_sha256_free(&ctx);
+
+  return digestToHex(digest);
+}
+
+// ============================================================================
+// CONTENT DIGEST CACHE (?hash=1 listings)
+// ============================================================================
+// Hashing every file inside the async_tcp callback would stall the network task
+// (chart.umd.min.js alone is ~200KB), so files are only read back for hashing at
+// boot; writes through this API hash the bytes they write, and the listing only
+// reads the digests back.
+// Only touched from registerRoutes() (before server.begin()) and async_tcp callbacks.
+
+struct FileDigest {
+  size_t size;
+  time_t lastWrite;
+  String sha256;
+};
+static std::map<String, FileDigest> digestCache;
+
+/**
+ * Record the digest of a file that was just written (size/time from the
+ * directory entry, no content read)
+ */
+static void storeDigest(const String& path, const String& sha256) {
+  File file = LittleFS.open(path, "r");
+  if (!file) {
+    digestCache.erase(path);
+    return;
+  }
+  size_t size = file.size();
+  time_t lastWrite = file.getLastWrite();
+  file.close();
+  digestCache[path] = {size, lastWrite, sha256};
+}
+
+/**
+ * Cached digest of a file, or nullptr if it changed (size/time) since it was hashed,
+ * e.g. a JSON file rewritten by the firmware itself
+ */
+static const String* cachedDigest(const String& path, size_t size, time_t lastWrite) {
+  auto it = digestCache.find(path);
+  if (it == digestCache.end() || it->second.size != size || it->second.lastWrite != lastWrite) {
+    return nullptr;
+  }
+  return &it->second.sha256;
+}
+
+static void hashDirRecursive(const char* dirname) {
+  File root = LittleFS.open(dirname);
+  if (!root || !root.isDirectory()) {
+    return;
+  }
+
+  for (File file = root.openNextFile(); file; file = root.openNextFile()) {
+    String path = String(dirname) + "/" + String(file.name());
+    if (path.startsWith("//")) path = path.substring(1);
+    bool isDir = file.isDirectory();
+    file.close();
+
+    if (isDir) {
+      hashDirRecursive(path.c_str());
+    } else {
+      storeDigest(path, FilesystemManager::sha256File(path));
+      // 🛡️ WATCHDOG: Yield between files while hashing
+      vTaskDelay(pdMS_TO_TICKS(1));
+    }
+  }
+  root.close();
+}
+
+/**
+ * A plain file was just written: drop its pre-compressed copy, which
+ * serveStaticFile would otherwise keep serving in its place.
+ */
+static void removeStaleGzip(const String& path) {
+  if (path.endsWith(".gz")) return;
+  String gzPath = path + ".gz";
+  if (LittleFS.exists(gzPath) && LittleFS.remove(gzPath)) {
+    digestCache.erase(gzPath);
+  }
+}
+
 
 // ============================================================================
 // ROUTE REGISTRATION
 // ============================================================================
 
 void FilesystemManager::registerRoutes() {
+  // Digests for ?hash=1 listings, computed here rather than inside a request
+  hashDirRecursive("/");
+
   // GET /filesystem - Serve filesystem.html from LittleFS
   server.on("/filesystem", HTTP_GET, [this](AsyncWebServerRequest* request) {
-    if (LittleFS.exists("/filesystem.html")) {
-      AsyncWebServerResponse* response = request->beginResponse(LittleFS, "/filesystem.html", "text/html; charset=UTF-8");
+    // Pre-compressed copy first (upload_html.py --gzip)
+    bool gzipped = LittleFS.exists("/filesystem.html.gz");
+    if (gzipped || LittleFS.exists("/filesystem.html")) {
+      AsyncWebServerResponse* response = request->beginResponse(
+        LittleFS, gzipped ? "/filesystem.html.gz" : "/filesystem.html", "text/html; charset=UTF-8");
+      if (gzipped) response->addHeader("Content-Encoding", "gzip");
       response->addHeader("Cache-Control", "no-cache, no-store, must-revalidate");
       request->send(response);
     } else {
@@ -97,13 +235,12 @@ void FilesystemManager::registerRoutes() {
     collectBody // body collector
   );
 
-  // POST /api/fs/upload - Upload file (multipart)
+  // POST /api/fs/upload - Upload file(s) (multipart, one "file" part per file)
   server.on("/api/fs/upload", HTTP_POST,
     // onRequest handler (called after upload completes)
     [this](AsyncWebServerRequest* request) {
-      if (_uploadFailed) {
+      if (!request->_tempObject || uploadState(request).failed) {
         sendJsonError(request, 500, "Upload failed: incomplete write");
-        _uploadFailed = false;
       } else {
         sendJsonSuccess(request, "File uploaded");
       }
@@ -138,7 +275,7 @@ void FilesystemManager::registerRoutes() {
 // ============================================================================
 
 // Helper function for recursive directory listing (extracted from lambda - S1188)
-static void listDirRecursive(const char* dirname, const JsonArray& parentArray, uint32_t& usedBytes) {
+static void listDirRecursive(const char* dirname, const JsonArray& parentArray, uint32_t& usedBytes, bool withHash) {
   File root = LittleFS.open(dirname);
   if (!root || !root.isDirectory()) {
     return;
@@ -158,9 +295,13 @@ static void listDirRecursive(const char* dirname, const JsonArray& parentArray,
 
     if (!file.isDirectory()) {
       usedBytes += file.size();
+      if (withHash) {
+        const String* sha256 = cachedDigest(path, file.size(), file.getLastWrite());
+        if (sha256) fileObj["sha256"] = *sha256;
+      }
     } else {
       JsonArray childrenArray = fileObj["children"].to<JsonArray>();
-      listDirRecursive(path.c_str(), childrenArray, usedBytes);
+      listDirRecursive(path.c_str(), childrenArray, usedBytes, withHash);
     }
   }
   root.close();
@@ -173,12 +314,18 @@ void FilesystemManager::handleListFiles(AsyncWebServerRequest* request) {
   uint32_t usedBytes = 0;
   uint32_t totalBytes = LittleFS.totalBytes();
 
+  // ?hash=1 adds a per-file "sha256" from the digest cache (omitted for files changed
+  // outside this API since they were hashed; clients then fall back to size/time)
+  bool withHash = request->hasParam("hash") && request->getParam("hash")->value() == "1";
+
   // Start recursion from root
-  listDirRecursive("/", filesArray, usedBytes);
+  listDirRecursive("/", filesArray, usedBytes, withHash);
 
   doc["usedBytes"] = usedBytes;
   doc["totalBytes"] = totalBytes;
   doc["freeSpace"] = totalBytes - usedBytes;
+  // Upload state lives on each request (_tempFile/_tempObject): clients may upload in parallel
+  doc["parallelUploads"] = true;
 
   sendJsonDoc(request, doc);
 }
@@ -275,12 +422,20 @@ void FilesystemManager::handleWriteFile(AsyncWebServerRequest* request) {
     return;
   }
 
+  uint8_t digest[32];
+  mbedtls_sha256(reinterpret_cast<const uint8_t*>(content.c_str()), content.length(), digest, 0);
+  storeDigest(path, digestToHex(digest));
+  removeStaleGzip(path);
+
   sendJsonSuccess(request, "File saved");
 }
 
 void FilesystemManager::handleUploadFile(AsyncWebServerRequest* request, const String& filename, size_t index, uint8_t* data, size_t len, bool isFinal) {
-  static File uploadFile;
-  static size_t totalWritten = 0;
+  // State lives on the request: a batch sends several parts through one request,
+  // and parallel requests must not share the open file
+  File& uploadFile = request->_tempFile;
+  UploadState& state = uploadState(request);
+  bool& uploadFailed = state.failed;
 
   if (index == 0) {
     // UPLOAD_FILE_START equivalent
@@ -297,7 +452,7 @@ void FilesystemManager::handleUploadFile(AsyncWebServerRequest* request, const S
       if (engine) engine->error("Upload rejected: file too large (" + String(contentLength) + " bytes needed, only " + String(available) + " bytes available)");
       else Serial.printf("Upload rejected: file too large (%d bytes needed, only %d bytes available)\n",
                    contentLength, available);
-      _uploadFailed = true;
+      uploadFailed = true;
       return;
     }
 
@@ -305,22 +460,29 @@ void FilesystemManager::handleUploadFile(AsyncWebServerRequest* request, const S
     createParentDirs(normalizedFilename);
 
     uploadFile = LittleFS.open(normalizedFilename, "w");
-    totalWritten = 0;
     if (!uploadFile) {
-      _uploadFailed = true;
+      uploadFailed = true;
+    } else {
+      if (state.hashing) mbedtls_sha256_free(&state.sha);  // previous part never finished
+      mbedtls_sha256_init(&state.sha);
+      mbedtls_sha256_starts(&state.sha, 0);  // 0 = SHA-256 (not SHA-224)
+      state.hashing = true;
     }
   }
 
   if (uploadFile && len > 0) {
     // UPLOAD_FILE_WRITE equivalent
     size_t written = uploadFile.write(data, len);
-    totalWritten += written;
 
     // 🛡️ PROTECTION: Verify all bytes were written
     if (written != len) {
       uploadFile.close();
       uploadFile = File();  // Invalidate to prevent further writes
-      _uploadFailed = true;
+      uploadFailed = true;
+      mbedtls_sha256_free(&state.sha);
+      state.hashing = false;
+    } else {
+      mbedtls_sha256_update(&state.sha, data, len);
     }
 
     // 🛡️ WATCHDOG: Yield CPU between chunks for system responsiveness
@@ -333,6 +495,16 @@ void FilesystemManager::handleUploadFile(AsyncWebServerRequest* request, const S
       // 🛡️ PROTECTION: Flush before closing
       uploadFile.flush();
       uploadFile.close();
+      uploadFile = File();  // Next part of a batch opens its own file
+
+      uint8_t digest[32];
+      mbedtls_sha256_finish(&state.sha, digest);
+      mbedtls_sha256_free(&state.sha);
+      state.hashing = false;
+
+      String normalizedFilename = normalizePath(filename);
+      storeDigest(normalizedFilename, digestToHex(digest));
+      removeStaleGzip(normalizedFilename);
 
       // 🛡️ STABILITY: Let LittleFS GC + TCP stack settle before next request
       vTaskDelay(pdMS_TO_TICKS(UPLOAD_POST_CLOSE_DELAY_MS));
@@ -359,6 +531,7 @@ void FilesystemManager::handleDeleteFile(AsyncWebServerRequest* request) {
   }
 
   if (LittleFS.remove(path)) {
+    digestCache.erase(path);
     sendJsonSuccess(request, "File deleted");
   } else {
     sendJsonError(request, 500, "Failed to delete file");
@@ -392,6 +565,7 @@ void FilesystemManager::handleClearAllFiles(AsyncWebServerRequest* request) {
   };
 
   clearDir("/");
+  digestCache.clear();
 
   JsonDocument doc;
   doc["success"] = true;
@@ -0,0 +1,73 @@
+"""Regression tests for find_dead_code.py.
+
+Run from the project root: python -m unittest discover -s tests
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import find_dead_code  # noqa: E402
+
+
+def _analyze_includes(root: Path) -> list[dict]:
+    """Run analyze_header_includes the way main() feeds it."""
+    files = find_dead_code.collect_files(root)
+    all_contents, all_contents_clean = {}, {}
+    for filepath in files:
+        path, raw, clean = find_dead_code._load_and_clean(str(filepath))
+        all_contents[path] = raw
+        all_contents_clean[path] = clean
+    return find_dead_code.analyze_header_includes(files, all_contents, all_contents_clean, root)
+
+
+class HeaderIncludeTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        (self.root / "include" / "core").mkdir(parents=True)
+        (self.root / "include" / "communication").mkdir(parents=True)
+        (self.root / "src").mkdir()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, rel: str, text: str) -> None:
+        (self.root / rel).write_text(text, encoding="utf-8")
+
+    def test_short_shared_symbol_does_not_hide_unused_include(self):
+        # Mirrors StatusBroadcaster.h -> core/GlobalState.h: the only name both
+        # files share is a 2-char one, which must not count as a use
+        self._write("include/core/GlobalState.h",
+                    "#pragma once\n"
+                    "extern int ws;\n"
+                    "extern volatile bool calibrationInProgress;\n")
+        self._write("include/communication/StatusBroadcaster.h",
+                    "#pragma once\n"
+                    "#include \"core/GlobalState.h\"\n"
+                    "class StatusBroadcaster {\n"
+                    "public:\n"
+                    "    void begin(void* ws);\n"
+                    "};\n")
+
+        issues = _analyze_includes(self.root)
+
+        self.assertIn(("include/communication/StatusBroadcaster.h", 2, "core/GlobalState.h"),
+                      [(Path(i["file"]).as_posix(), i["line"], i["include"]) for i in issues])
+
+    def test_used_include_is_not_reported(self):
+        self._write("include/core/GlobalState.h",
+                    "#pragma once\n"
+                    "extern volatile bool calibrationInProgress;\n")
+        self._write("src/Main.cpp",
+                    "#include \"core/GlobalState.h\"\n"
+                    "void loop() { if (calibrationInProgress) return; }\n")
+
+        self.assertEqual(_analyze_includes(self.root), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
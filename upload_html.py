@@ -15,8 +15,10 @@ Usage:
     python upload_html.py --file js/core/app.js  # Upload specific file
     python upload_html.py --all              # Upload all HTML/JS/CSS files
     python upload_html.py --js               # Upload only JS files (recursive)
+    python upload_html.py --all --jobs 6     # Upload all files, 6 at a time
     python upload_html.py --sync             # Smart sync: upload only changed files
     python upload_html.py --sync-force       # Force sync: upload all files + delete orphans
+    python upload_html.py --sync --gzip      # Sync HTML/JS/CSS as pre-compressed .gz copies
     python upload_html.py --list             # List files on ESP32
     python upload_html.py --delete /js/old.js  # Delete specific file on ESP32
     python upload_html.py --backup           # Backup critical files from ESP32
@@ -24,20 +26,89 @@ Usage:
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+import asyncio
+import gzip
+import hashlib
+import io
+import json
+import threading
 import time
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
+# aiohttp runs bulk uploads on one event loop instead of a thread pool (--async)
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# orjson parses API responses straight from the body bytes, faster than response.json(); stdlib fallback
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# requests_toolbelt streams multipart bodies (Content-Length known, ~8 KB in memory);
+# without it requests builds each body in memory
+try:
+    from requests_toolbelt import MultipartEncoder
+except ImportError:
+    MultipartEncoder = None
+
+# watchdog gets native change notifications (inotify/FSEvents/ReadDirectoryChangesW);
+# --watch falls back to polling mtime without it
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+
 # Configuration
 ESP32_IP = "192.168.1.85"
 API_BASE = f"http://{ESP32_IP}/api/fs"
 DATA_DIR = "data"
 JS_DIR = "data/js"
-CSS_DIR = "data/css"
-LANG_DIR = "data/lang"
 HISTORY_DIR = ".history"
+UPLOAD_CACHE_FILE = ".upload_cache.json"  # {ip + esp_path: {size, mtime}} of last successful upload
+HASH_CACHE_FILE = ".hash_cache.json"  # {local_path: {size, mtime_ns, sha256}} to skip re-hashing
+BACKUP_ETAG_FILE = ".backup_etags.json"  # {ip + esp_path: {etag, backup}} of the last backup of each file
+
+# Web assets managed by sync (a tuple, so str.endswith checks them all in one call)
+WEB_EXTENSIONS = ('.html', '.js', '.css')
+
+# Parallel uploads (ESP32 AsyncWebServer handles a handful of concurrent requests), used only when
+# the firmware reports "parallelUploads" (per-request upload state); older firmware gets one at a time
+DEFAULT_CONCURRENCY = 4
+HTTP_POOL_SIZE = 8  # keep-alive connections kept per host (>= concurrency)
+
+# Transient failures (ESP32 busy, WiFi drop) are retried by the HTTP adapter with backoff (0.3s, 0.6s, 1.2s).
+# Connect errors are retried for every method (nothing was sent yet); read errors and 502/503/504 only
+# for GET, since a streamed upload body can't be replayed - upload_file re-sends those itself.
+HTTP_RETRY = Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504),
+                   allowed_methods=frozenset({'GET', 'HEAD'}), raise_on_status=False)
+
+# --watch: quiet period that coalesces an editor's save burst into one upload
+WATCH_DEBOUNCE_S = 0.1
+
+# Small files are sent several per multipart POST (one "file" part each);
+# the byte cap keeps each request well inside the ESP32's free heap
+BATCH_MAX_FILES = 8
+BATCH_MAX_BYTES = 256 * 1024
+
+# Upload bodies up to this size are formatted by hand in memory (_fast_upload); larger ones stream from disk
+INLINE_BODY_MAX_BYTES = 256 * 1024
+MULTIPART_BOUNDARY = f"----esp32upload{os.urandom(8).hex()}"
+_PART_TAIL = b'\r\n'
+_BODY_TAIL = f"--{MULTIPART_BOUNDARY}--\r\n".encode()
+
+# --gzip: these are stored as <name>.gz, which the firmware serves with Content-Encoding: gzip
+GZIP_EXTENSIONS = WEB_EXTENSIONS
 
 # Files to backup automatically (critical user data on ESP32)
 BACKUP_FILES = [
@@ -51,15 +122,30 @@ BACKUP_FILES = [
 # FILE OPERATIONS
 # ============================================================================
 
-def upload_file(file_path, esp32_ip=ESP32_IP, target_path=None):
-    """Upload a file to ESP32 via FilesystemManager API"""
-    if not os.path.exists(file_path):
-        print(f"❌ Error: File not found: {file_path}")
-        return False
-    
-    file_size = os.path.getsize(file_path)
-    
-    # Determine target path on ESP32
+_print_lock = threading.Lock()
+
+
+def _log(line):
+    """Print a whole line at once (uploads may run in parallel threads)"""
+    with _print_lock:
+        print(line, flush=True)
+
+
+def new_session():
+    """HTTP session with a keep-alive connection pool (no per-request TCP handshake) and HTTP_RETRY"""
+    session = requests.Session()
+    session.headers['Connection'] = 'keep-alive'
+    session.mount('http://', HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE,
+                                         max_retries=HTTP_RETRY))
+    return session
+
+
+# Shared by every request this tool makes to the ESP32
+SESSION = new_session()
+
+
+def _target_path(file_path, target_path=None):
+    """ESP32 path for a local file: explicit target, else the path below data/"""
     if target_path:
         target_filename = target_path
     else:
@@ -75,42 +161,109 @@ def upload_file(file_path, esp32_ip=ESP32_IP, target_path=None):
     target_filename = target_filename.replace('\\', '/')
     if not target_filename.startswith('/'):
         target_filename = '/' + target_filename
+    return target_filename
+
+
+def _gzip_target(file_path, target_path=None):
+    """ESP32 path for the pre-compressed copy of a web asset (plain path for other files)"""
+    target_filename = _target_path(file_path, target_path)
+    if target_filename.endswith(GZIP_EXTENSIONS):
+        return target_filename + '.gz'
+    return target_filename
+
+
+def _gzip_bytes(local_path):
+    """Deterministic gzip of a local file (mtime=0, so unchanged content gives the same bytes and hash)"""
+    with open(local_path, 'rb') as f:
+        return gzip.compress(f.read(), compresslevel=9, mtime=0)
+
+
+def _open_payload(local_path, target_path):
+    """File object with the bytes to store at target_path: compressed on the fly for a *.gz target"""
+    if target_path.endswith('.gz') and not local_path.endswith('.gz'):
+        return io.BytesIO(_gzip_bytes(local_path))
+    return open(local_path, 'rb')
+
+
+def _payload_size(local_path, target_path):
+    """Number of bytes _open_payload would send"""
+    if target_path.endswith('.gz') and not local_path.endswith('.gz'):
+        return len(_gzip_bytes(local_path))
+    return os.path.getsize(local_path)
+
+
+def _fast_upload(session, endpoint, parts, timeout=30):
+    """POST [(target_path, bytes), ...] as a hand-formatted multipart body (fixed shape: one "file" part each)"""
+    body = bytearray()
+    for target, data in parts:
+        filename = target.replace('"', '%22')
+        body += (f'--{MULTIPART_BOUNDARY}\r\n'
+                 f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+                 'Content-Type: application/octet-stream\r\n\r\n').encode()
+        body += data
+        body += _PART_TAIL
+    body += _BODY_TAIL
+    return session.post(endpoint, data=bytes(body), timeout=timeout,
+                        headers={'Content-Type': f'multipart/form-data; boundary={MULTIPART_BOUNDARY}'})
+
+
+def _payload_len(f):
+    """Size of an open payload (BytesIO from _open_payload, or a real file)"""
+    if isinstance(f, io.BytesIO):
+        return f.getbuffer().nbytes
+    return os.fstat(f.fileno()).st_size
+
+
+def _post_multipart(endpoint, parts, session=None, timeout=30):
+    """POST [(target_path, file_obj), ...] as "file" parts: small bodies via _fast_upload, else streamed from disk"""
+    if sum(_payload_len(f) for _, f in parts) <= INLINE_BODY_MAX_BYTES:
+        return _fast_upload(session or SESSION, endpoint, [(target, f.read()) for target, f in parts], timeout)
+    if MultipartEncoder is not None:
+        encoder = MultipartEncoder(fields=[('file', (target, f, 'application/octet-stream')) for target, f in parts])
+        return (session or SESSION).post(endpoint, data=encoder,
+                                         headers={'Content-Type': encoder.content_type}, timeout=timeout)
+    return (session or SESSION).post(endpoint, files=[('file', (target, f)) for target, f in parts],
+                                     timeout=timeout)
+
+
+def upload_file(file_path, esp32_ip=ESP32_IP, target_path=None, session=None):
+    """Upload a file to ESP32 via FilesystemManager API (over SESSION unless another session is given)"""
+    if not os.path.exists(file_path):
+        print(f"❌ Error: File not found: {file_path}")
+        return False
+    
+    file_size = os.path.getsize(file_path)
+    target_filename = _target_path(file_path, target_path)
     
     endpoint = f"http://{esp32_ip}/api/fs/upload"
     
     max_retries = 3
     for attempt in range(1, max_retries + 1):
+        if attempt == 1:
+            prefix = f"📤 {file_path} → {target_filename} ({file_size} bytes)..."
+        else:
+            prefix = f"   🔄 {target_filename}: retry {attempt}/{max_retries}..."
         try:
-            if attempt == 1:
-                print(f"📤 {file_path} → {target_filename} ({file_size} bytes)...", end=" ")
-            else:
-                print(f"   🔄 Retry {attempt}/{max_retries}...", end=" ")
             start_time = time.time()
             
-            with open(file_path, 'rb') as f:
-                files = {'file': (target_filename, f)}
-                response = requests.post(endpoint, files=files, timeout=30)
+            with _open_payload(file_path, target_filename) as f:
+                response = _post_multipart(endpoint, [(target_filename, f)], session)
             
             elapsed = time.time() - start_time
             
             if response.status_code == 200:
-                print(f"✅ ({elapsed:.2f}s)")
+                _remote_list_cache.clear()
+                _log(f"{prefix} ✅ ({elapsed:.2f}s)")
                 return True
             else:
-                print(f"❌ HTTP {response.status_code}")
+                _log(f"{prefix} ❌ HTTP {response.status_code}")
                 if attempt < max_retries:
                     time.sleep(2)  # Wait before retry
                     continue
                 return False
                 
-        except requests.exceptions.ConnectionError:
-            print("❌ Connection error")
-            if attempt < max_retries:
-                time.sleep(2)
-                continue
-            return False
         except Exception as e:
-            print(f"❌ {e}")
+            _log(f"{prefix} ❌ {e}")
             if attempt < max_retries:
                 time.sleep(2)
                 continue
@@ -119,27 +272,63 @@ def upload_file(file_path, esp32_ip=ESP32_IP, target_path=None):
     return False
 
 
+def upload_files_batch(jobs, esp32_ip=ESP32_IP, session=None):
+    """Upload [(local_path, target_path), ...] in one multipart POST; True if every file was written"""
+    targets = [_target_path(local_path, target) for local_path, target in jobs]
+    prefix = f"📦 {len(jobs)} files → {', '.join(targets)}..."
+    endpoint = f"http://{esp32_ip}/api/fs/upload"
+    
+    handles = []
+    try:
+        start_time = time.time()
+        for (local_path, _), target in zip(jobs, targets):
+            handles.append(_open_payload(local_path, target))
+        response = _post_multipart(endpoint, list(zip(targets, handles)), session, timeout=60)
+        elapsed = time.time() - start_time
+    except Exception as e:
+        _log(f"{prefix} ❌ {e}")
+        return False
+    finally:
+        for f in handles:
+            f.close()
+    
+    if response.status_code == 200:
+        _remote_list_cache.clear()
+        _log(f"{prefix} ✅ ({elapsed:.2f}s)")
+        return True
+    _log(f"{prefix} ❌ HTTP {response.status_code}")
+    return False
+
+
 def download_file(remote_path, esp32_ip=ESP32_IP):
     """Download a file from ESP32, returns content or None"""
+    return download_if_changed(remote_path, esp32_ip)[0]
+
+
+def download_if_changed(remote_path, esp32_ip=ESP32_IP, etag=None):
+    """Conditional download: (content, etag) if changed, (None, etag) on 304 Not Modified, (None, None) if unavailable"""
     if not remote_path.startswith('/'):
         remote_path = '/' + remote_path
     
-    # Use raw file access endpoint
     endpoint = f"http://{esp32_ip}{remote_path}"
+    headers = {'If-None-Match': etag} if etag else None
     
     try:
-        response = requests.get(endpoint, timeout=10)
+        response = SESSION.get(endpoint, headers=headers, timeout=10)
         if response.status_code == 200:
-            return response.content
-        return None
+            return response.content, response.headers.get('ETag')
+        if response.status_code == 304:
+            return None, etag
+        return None, None
     except Exception:
-        return None
+        return None, None
 
 
 def backup_critical_files(esp32_ip=ESP32_IP, silent=False):
     """
     Backup critical files from ESP32 to .history/ folder
     Files are suffixed with datetime: stats_20241209_164530.json
+    Files unchanged since their last backup (same ETag, firmware answers 304) are not written again
     Returns number of files backed up
     """
     # Create history directory
@@ -148,14 +337,33 @@ def backup_critical_files(esp32_ip=ESP32_IP, silent=False):
     
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     backed_up = 0
+    unchanged = 0
     
     if not silent:
         print("💾 Backing up critical files from ESP32...")
     
-    for remote_file in BACKUP_FILES:
-        content = download_file(remote_file, esp32_ip)
-        
-        if content and len(content) > 2:  # Skip empty files (just "{}" or "[]")
+    # Validators of the previous backups (only while that backup is still in .history/)
+    etags = _load_cache(BACKUP_ETAG_FILE)
+    remote_files = list(dict.fromkeys(BACKUP_FILES))
+    known = {}
+    for remote_file in remote_files:
+        entry = etags.get(esp32_ip + remote_file)
+        if entry and (history_path / entry['backup']).exists():
+            known[remote_file] = entry
+    
+    # Fetch all files concurrently (independent GETs on the pooled session), write sequentially
+    def fetch(remote_file):
+        return download_if_changed(remote_file, esp32_ip, known.get(remote_file, {}).get('etag'))
+    
+    with ThreadPoolExecutor(max_workers=min(len(remote_files), HTTP_POOL_SIZE) or 1) as ex:
+        downloads = list(ex.map(fetch, remote_files))
+    
+    for remote_file, (content, etag) in zip(remote_files, downloads):
+        if content is None and etag:
+            if not silent:
+                print(f"   ⏭️  {remote_file} unchanged since .history/{known[remote_file]['backup']}")
+            unchanged += 1
+        elif content and len(content) > 2:  # Skip empty files (just "{}" or "[]")
             # Create backup filename: /stats.json -> stats_20241209_164530.json
             base_name = remote_file.lstrip('/').replace('/', '_')
             name_part = base_name.rsplit('.', 1)[0]
@@ -168,10 +376,19 @@ def backup_critical_files(esp32_ip=ESP32_IP, silent=False):
             if not silent:
                 print(f"   📄 {remote_file} → .history/{backup_name} ({len(content)} bytes)")
             backed_up += 1
+            # Remember only content-hash ETags (quoted SHA-256): a size/time validator
+            # can match after a same-size rewrite and hide a change
+            if etag and len(etag.strip('"')) == 64:
+                etags[esp32_ip + remote_file] = {'etag': etag, 'backup': backup_name}
+    
+    if backed_up > 0:
+        _save_cache(etags, BACKUP_ETAG_FILE)
     
     if not silent:
         if backed_up > 0:
             print(f"   ✅ {backed_up} file(s) backed up to .history/")
+        elif unchanged > 0:
+            print(f"   ✅ {unchanged} file(s) unchanged since their last backup")
         else:
             print("   ℹ️  No critical files found on ESP32 (or all empty)")
         print()
@@ -181,30 +398,33 @@ def backup_critical_files(esp32_ip=ESP32_IP, silent=False):
 
 def list_history_files():
     """List all backup files in .history/ folder, grouped by type"""
-    history_path = Path(HISTORY_DIR)
-    if not history_path.exists():
+    if not os.path.isdir(HISTORY_DIR):
         return {}
     
     # Group files by base name (stats, playlists, etc.)
+    # One scandir pass: the DirEntry carries name/type, so only the size needs a stat
     files_by_type = {}
-    for f in history_path.glob('*.json'):
-        # Parse filename: stats_20251209_171803.json -> type=stats, timestamp=20251209_171803
-        parts = f.stem.rsplit('_', 2)  # Split from right to get name_date_time
-        if len(parts) >= 3:
-            file_type = parts[0]  # stats, playlists, config, sequences
-            timestamp = f"{parts[1]}_{parts[2]}"
-        else:
-            file_type = f.stem
-            timestamp = "unknown"
-        
-        if file_type not in files_by_type:
-            files_by_type[file_type] = []
-        files_by_type[file_type].append({
-            'path': f,
-            'name': f.name,
-            'timestamp': timestamp,
-            'size': f.stat().st_size
-        })
+    with os.scandir(HISTORY_DIR) as it:
+        for entry in it:
+            name = entry.name
+            if not name.endswith('.json') or not entry.is_file():
+                continue
+            # Parse filename: stats_20251209_171803.json -> type=stats, timestamp=20251209_171803
+            stem = name[:-len('.json')]
+            parts = stem.rsplit('_', 2)  # Split from right to get name_date_time
+            if len(parts) >= 3:
+                file_type = parts[0]  # stats, playlists, config, sequences
+                timestamp = f"{parts[1]}_{parts[2]}"
+            else:
+                file_type = stem
+                timestamp = "unknown"
+            
+            files_by_type.setdefault(file_type, []).append({
+                'path': Path(entry.path),
+                'name': name,
+                'timestamp': timestamp,
+                'size': entry.stat().st_size
+            })
     
     # Sort each type by timestamp (most recent first)
     for file_type in files_by_type:
@@ -297,11 +517,17 @@ def delete_file(remote_path, esp32_ip=ESP32_IP):
     
     try:
         print(f"🗑️  Deleting {remote_path}...", end=" ")
-        response = requests.post(endpoint, json={"path": remote_path}, timeout=10)
+        response = SESSION.post(endpoint, json={"path": remote_path}, timeout=10)
         
         if response.status_code == 200:
+            _remote_list_cache.clear()
             print("✅")
             return True
+        elif response.status_code == 404:
+            # Already gone (e.g. a stale .gz the firmware dropped when its plain file was uploaded)
+            _remote_list_cache.clear()
+            print("✅ (already gone)")
+            return True
         else:
             print(f"❌ HTTP {response.status_code}")
             return False
@@ -311,10 +537,24 @@ def delete_file(remote_path, esp32_ip=ESP32_IP):
         return False
 
 
-def list_remote_files(esp32_ip=ESP32_IP, path="/"):
-    """List files on ESP32 recursively, returns dict {path: {size, time}} for metadata,
-    or list of paths for backward compatibility via list(result.keys())"""
-    endpoint = f"http://{esp32_ip}/api/fs/list"
+# Successful listings for this run, {(esp32_ip, hashes): files}; cleared on every upload/delete
+_remote_list_cache = {}
+# {esp32_ip: bool} whether the firmware keeps upload state per request (safe to upload in parallel)
+_parallel_uploads = {}
+
+
+def list_remote_files(esp32_ip=ESP32_IP, path="/", hashes=False):
+    """List files on ESP32 recursively, returns dict {path: {size, time[, sha256]}} for metadata,
+    or list of paths for backward compatibility via list(result.keys()).
+    hashes=True asks the firmware for per-file SHA-256 (older firmware just omits it).
+    Repeated calls within a run reuse the last listing until something is uploaded or deleted."""
+    cached = _remote_list_cache.get((esp32_ip, hashes))
+    if cached is None and not hashes:
+        cached = _remote_list_cache.get((esp32_ip, True))  # a hashed listing answers a plain one too
+    if cached is not None:
+        return dict(cached)
+    
+    endpoint = f"http://{esp32_ip}/api/fs/list" + ("?hash=1" if hashes else "")
     files = {}
     
     def extract_files(items, base_path=""):
@@ -329,13 +569,17 @@ def list_remote_files(esp32_ip=ESP32_IP, path="/"):
                     'size': item.get('size', 0),
                     'time': item.get('time', 0),
                 }
+                if item.get('sha256'):
+                    files[item_path]['sha256'] = item['sha256']
     
     try:
-        response = requests.get(endpoint, timeout=10)
+        response = SESSION.get(endpoint, timeout=10)
         if response.status_code == 200:
-            data = response.json()
-            # API returns { files: [...], usedBytes, totalBytes, freeSpace }
+            data = _loads(response.content)
+            # API returns { files: [...], usedBytes, totalBytes, freeSpace[, parallelUploads] }
             extract_files(data.get('files', []))
+            _parallel_uploads[esp32_ip] = bool(data.get('parallelUploads'))
+            _remote_list_cache[(esp32_ip, hashes)] = dict(files)
         return files
     except Exception as e:
         print(f"❌ Error listing files: {e}")
@@ -346,132 +590,317 @@ def list_remote_files(esp32_ip=ESP32_IP, path="/"):
 # FILE COLLECTION (LOCAL)
 # ============================================================================
 
+def _walk_files(base_dir, exts=None):
+    """Yield file paths under base_dir (os.scandir, no per-entry Path or extra stat);
+    exts is a tuple of lowercase suffixes, None for all files"""
+    stack = [base_dir]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file() and (exts is None or entry.name.lower().endswith(exts)):
+                    yield entry.path
+
+
 def get_all_files_recursive(base_dir, extensions=None):
     """Get all files recursively from a directory"""
-    files = []
-    base_path = Path(base_dir)
-    
-    if not base_path.exists():
-        return files
-    
-    for item in base_path.rglob('*'):
-        if item.is_file():
-            if extensions is None or item.suffix.lower() in extensions:
-                files.append(str(item))
-    
-    return files
+    if not os.path.isdir(base_dir):
+        return []
+    return list(_walk_files(str(base_dir), tuple(extensions) if extensions is not None else None))
 
 
 def get_local_files():
-    """Get all uploadable local files with their ESP32 target paths"""
+    """Get all uploadable local files with their ESP32 target paths
+    (web assets anywhere under data/, plus the lang/ JSON translations)"""
     files = {}
+    if not os.path.isdir(DATA_DIR):
+        return files
     
-    # HTML files in data/
-    for html_file in ['index.html', 'filesystem.html', 'setup.html']:
-        local_path = os.path.join(DATA_DIR, html_file)
-        if os.path.exists(local_path):
-            files['/' + html_file] = local_path
-    
-    # JS files (recursive)
-    if os.path.exists(JS_DIR):
-        for js_file in get_all_files_recursive(JS_DIR, ['.js']):
-            # Convert to ESP32 path
-            rel_path = os.path.relpath(js_file, DATA_DIR)
-            esp_path = '/' + rel_path.replace('\\', '/')
-            files[esp_path] = js_file
-    
-    # CSS files (recursive)
-    if os.path.exists(CSS_DIR):
-        for css_file in get_all_files_recursive(CSS_DIR, ['.css']):
-            rel_path = os.path.relpath(css_file, DATA_DIR)
-            esp_path = '/' + rel_path.replace('\\', '/')
-            files[esp_path] = css_file
-    
-    # Lang files (JSON translations)
-    if os.path.exists(LANG_DIR):
-        for lang_file in get_all_files_recursive(LANG_DIR, ['.json']):
-            rel_path = os.path.relpath(lang_file, DATA_DIR)
-            esp_path = '/' + rel_path.replace('\\', '/')
-            files[esp_path] = lang_file
+    # One walk over data/, classified by suffix (same rule sync applies to the remote list)
+    for local_path in _walk_files(DATA_DIR, WEB_EXTENSIONS + ('.json',)):
+        esp_path = '/' + os.path.relpath(local_path, DATA_DIR).replace('\\', '/')
+        if esp_path.endswith('.json') and not esp_path.startswith('/lang/'):
+            continue
+        files[esp_path] = local_path
     
     return files
 
 
+# ============================================================================
+# UPLOAD CACHE (skip files unchanged since their last upload)
+# ============================================================================
+
+def _load_cache(cache_file=UPLOAD_CACHE_FILE):
+    """Load a local JSON cache (upload or hash cache), {} if missing or unreadable"""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache, cache_file=UPLOAD_CACHE_FILE):
+    """Write a local JSON cache"""
+    try:
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=1, sort_keys=True)
+    except OSError as e:
+        print(f"⚠️  Could not save {cache_file}: {e}")
+
+
+def _local_sha256(local_path):
+    """Hex SHA-256 of a local file's content (same digest as /api/fs/list?hash=1)"""
+    digest = hashlib.sha256()
+    with open(local_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_local_hash(local_path, hashes, compressed=False):
+    """SHA-256 of a local file (or of its _gzip_bytes), reusing the cached entry while its mtime/size are unchanged"""
+    st = os.stat(local_path)
+    key = local_path + '.gz' if compressed else local_path
+    entry = hashes.get(key)
+    if entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+        return entry['sha256']
+    sha = hashlib.sha256(_gzip_bytes(local_path)).hexdigest() if compressed else _local_sha256(local_path)
+    hashes[key] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': sha}
+    return sha
+
+
+def _local_stamp(local_path):
+    """(size, mtime) signature of a local file as stored in the upload cache"""
+    st = os.stat(local_path)
+    return {'size': st.st_size, 'mtime': int(st.st_mtime)}
+
+
 # ============================================================================
 # SYNC OPERATIONS
 # ============================================================================
 
-def sync_files(esp32_ip=ESP32_IP, delete_orphans=True, force=False):
+def _batches(jobs):
+    """Group jobs into runs of at most BATCH_MAX_FILES files / BATCH_MAX_BYTES bytes"""
+    batch, batch_bytes = [], 0
+    for job in jobs:
+        size = os.path.getsize(job[0]) if os.path.exists(job[0]) else 0
+        if batch and (len(batch) >= BATCH_MAX_FILES or batch_bytes + size > BATCH_MAX_BYTES):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(job)
+        batch_bytes += size
+    if batch:
+        yield batch
+
+
+def _upload_batch(batch, esp32_ip=ESP32_IP, session=None):
+    """Upload one batch; if the combined POST fails, retry its files one by one"""
+    if len(batch) > 1:
+        if upload_files_batch(batch, esp32_ip, session):
+            return [(target, True) for _, target in batch]
+        _log("   ↩️  Batch failed, uploading its files one by one")
+    return [(target, upload_file(local_path, esp32_ip, target, session=session))
+            for local_path, target in batch]
+
+
+def supports_parallel_uploads(esp32_ip=ESP32_IP):
+    """True if the ESP32 firmware keeps upload state per request (it says so in its file listing);
+    older firmware shares one open file between uploads, so overlapping them corrupts files"""
+    if esp32_ip not in _parallel_uploads:
+        list_remote_files(esp32_ip)
+    return _parallel_uploads.get(esp32_ip, False)
+
+
+def _upload_many(jobs, esp32_ip=ESP32_IP, session=None, concurrency=DEFAULT_CONCURRENCY, batch=True,
+                 use_async=False):
+    """Upload [(local_path, target_path), ...]; returns [(target_path, ok), ...] in job order.
+    batch packs small files into shared POSTs; concurrency > 1 overlaps the requests in a thread pool
+    (or on an asyncio loop with use_async, if aiohttp is installed)."""
+    units = list(_batches(jobs)) if batch else [[job] for job in jobs]
+    
+    if concurrency > 1 and len(units) > 1 and not supports_parallel_uploads(esp32_ip):
+        _log("⚠️  ESP32 firmware shares one upload file between requests: uploading one at a time "
+             "(flash current firmware to enable --jobs)")
+        concurrency = 1
+    
+    if use_async:
+        if aiohttp is not None:
+            return asyncio.run(_upload_units_async(units, esp32_ip, concurrency))
+        _log("⚠️  --async needs aiohttp (pip install aiohttp), using threads")
+    
+    if concurrency <= 1:
+        results = []
+        for i, unit in enumerate(units):
+            unit_results = _upload_batch(unit, esp32_ip, session)
+            results.extend(unit_results)
+            # Small delay after successful upload to let the ESP32 process
+            if all(ok for _, ok in unit_results) and i < len(units) - 1:
+                time.sleep(0.2)
+        return results
+    
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        return [result for unit_results in ex.map(lambda unit: _upload_batch(unit, esp32_ip, session), units)
+                for result in unit_results]
+
+
+async def _post_files_async(session, esp32_ip, jobs, prefix, max_retries=1):
+    """POST [(local_path, target_path), ...] as one multipart upload (one "file" part each)"""
+    endpoint = f"http://{esp32_ip}/api/fs/upload"
+    for attempt in range(1, max_retries + 1):
+        if attempt > 1:
+            prefix = f"   🔄 {jobs[0][1]}: retry {attempt}/{max_retries}..."
+        handles = []
+        try:
+            start_time = time.time()
+            form = aiohttp.FormData(quote_fields=False)  # send "/js/app.js" as-is, not "%2Fjs%2Fapp.js"
+            for local_path, target in jobs:
+                f = _open_payload(local_path, target)
+                handles.append(f)
+                form.add_field('file', f, filename=target, content_type='application/octet-stream')
+            async with session.post(endpoint, data=form) as response:
+                status = response.status
+            elapsed = time.time() - start_time
+            
+            if status == 200:
+                _remote_list_cache.clear()
+                _log(f"{prefix} ✅ ({elapsed:.2f}s)")
+                return True
+            _log(f"{prefix} ❌ HTTP {status}")
+        except aiohttp.ClientConnectionError:
+            _log(f"{prefix} ❌ Connection error")
+        except Exception as e:
+            _log(f"{prefix} ❌ {e}")
+        finally:
+            for f in handles:
+                f.close()
+        if attempt < max_retries:
+            await asyncio.sleep(2)  # Wait before retry
+    return False
+
+
+async def upload_file_async(session, file_path, esp32_ip=ESP32_IP, target_path=None):
+    """aiohttp counterpart of upload_file (same target rules, 3 attempts)"""
+    if not os.path.exists(file_path):
+        _log(f"❌ Error: File not found: {file_path}")
+        return False
+    target_filename = _target_path(file_path, target_path)
+    prefix = f"📤 {file_path} → {target_filename} ({os.path.getsize(file_path)} bytes)..."
+    return await _post_files_async(session, esp32_ip, [(file_path, target_filename)], prefix, max_retries=3)
+
+
+async def _upload_batch_async(session, batch, esp32_ip=ESP32_IP):
+    """aiohttp counterpart of _upload_batch"""
+    if len(batch) > 1:
+        jobs = [(local_path, _target_path(local_path, target)) for local_path, target in batch]
+        prefix = f"📦 {len(jobs)} files → {', '.join(target for _, target in jobs)}..."
+        if all(os.path.exists(p) for p, _ in jobs) and await _post_files_async(session, esp32_ip, jobs, prefix):
+            return [(target, True) for _, target in batch]
+        _log("   ↩️  Batch failed, uploading its files one by one")
+    return [(target, await upload_file_async(session, local_path, esp32_ip, target))
+            for local_path, target in batch]
+
+
+async def _upload_units_async(units, esp32_ip=ESP32_IP, concurrency=DEFAULT_CONCURRENCY):
+    """Upload all batches concurrently on one ClientSession; the connector bounds open requests"""
+    connector = aiohttp.TCPConnector(limit=max(1, concurrency))
+    timeout = aiohttp.ClientTimeout(total=60)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        per_unit = await asyncio.gather(*(_upload_batch_async(session, unit, esp32_ip) for unit in units))
+    return [result for unit_results in per_unit for result in unit_results]
+
+
+def sync_files(esp32_ip=ESP32_IP, delete_orphans=True, force=False, concurrency=DEFAULT_CONCURRENCY, batch=True,
+               use_async=False, compress=False):
     """Sync local files to ESP32, optionally deleting orphans.
-    Smart mode (force=False): only uploads files whose size differs from remote.
-    Force mode (force=True): uploads all files unconditionally."""
+    Smart mode (force=False): only uploads files whose SHA-256 differs from the ESP32's copy;
+    with firmware that doesn't report hashes, files changed since their last upload
+    (size/mtime from .upload_cache.json, per ESP32), or whose size differs from the remote copy.
+    Force mode (force=True): uploads all files unconditionally.
+    compress=True stores HTML/JS/CSS as <path>.gz; the plain copies then become orphans
+    (and vice versa without it), so a deleting sync switches the ESP32 over cleanly."""
     mode_label = "force" if force else "smart"
     print(f"🔄 Syncing files to ESP32... ({mode_label})")
     print()
     
-    # Get local files
-    local_files = get_local_files()
-    local_paths = set(local_files.keys())
+    # Get local files, sorted once: every list below is derived from them in this order
+    local_files = dict(sorted(get_local_files().items()))
     
     print(f"📁 Local files: {len(local_files)}")
-    for path in sorted(local_paths):
+    for path in local_files:
         print(f"   {path}")
     print()
     
     # Get remote files with metadata
     print("📡 Fetching remote file list...")
-    remote_files_meta = list_remote_files(esp32_ip)
+    remote_files_meta = list_remote_files(esp32_ip, hashes=not force)
     
-    # Filter to only web assets (not stats.json, playlists.json, etc.)
-    web_extensions = ['.html', '.js', '.css']
+    # Filter to only web assets (not stats.json, playlists.json, etc.), plain or pre-compressed
     remote_web_meta = {p: m for p, m in remote_files_meta.items()
-                       if any(p.endswith(ext) for ext in web_extensions)
-                       or p.startswith('/lang/')}
-    remote_paths = set(remote_web_meta.keys())
+                       if p.removesuffix('.gz').endswith(WEB_EXTENSIONS) or p.startswith('/lang/')}
+    remote_paths = sorted(remote_web_meta)
     
     print(f"📡 Remote web files: {len(remote_web_meta)}")
-    for path in sorted(remote_paths):
+    for path in remote_paths:
         print(f"   {path}")
     print()
     
+    # ESP32 path each local file should end up at
+    if compress:
+        local_files = {_gzip_target(local_path, esp_path): local_path for esp_path, local_path in local_files.items()}
+    
     # Determine which files need uploading
+    cache = _load_cache()
+    hashes = _load_cache(HASH_CACHE_FILE)
     if force:
-        to_upload = local_paths
+        to_upload = list(local_files)
         skipped = 0
     else:
-        to_upload = set()
+        to_upload = []
         skipped = 0
-        for esp_path in sorted(local_paths):
+        for esp_path in local_files:
             local_path = local_files[esp_path]
-            local_size = os.path.getsize(local_path)
+            stamp = _local_stamp(local_path)
             remote_meta = remote_web_meta.get(esp_path)
+            cache_key = esp32_ip + esp_path  # per board: another --ip must not inherit these stamps
+            cached = cache.get(cache_key)
             
             if remote_meta is None:
                 # New file, not on ESP32 yet
-                to_upload.add(esp_path)
-            elif local_size != remote_meta['size']:
-                # Size differs → content changed
-                to_upload.add(esp_path)
+                to_upload.append(esp_path)
+            elif 'sha256' in remote_meta:
+                # Firmware reports content hashes: upload only if the bytes differ
+                if get_local_hash(local_path, hashes, esp_path.endswith('.gz')) != remote_meta['sha256']:
+                    to_upload.append(esp_path)
+                else:
+                    cache[cache_key] = stamp
+                    skipped += 1
+            elif cached is not None and cached != stamp:
+                # Modified since last upload (catches same-size edits)
+                to_upload.append(esp_path)
+            elif _payload_size(local_path, esp_path) != remote_meta['size']:
+                # Size differs from the ESP32's copy (never uploaded from here, reflashed, edited on the device)
+                to_upload.append(esp_path)
             else:
-                # Same size → skip
+                # Unchanged → skip (seed the cache so later same-size edits are caught)
+                cache.setdefault(cache_key, stamp)
                 skipped += 1
     
     # Files to delete (remote but not local)
-    to_delete = remote_paths - local_paths
+    to_delete = [path for path in remote_paths if path not in local_files]
     
     if not force and skipped > 0:
-        print(f"⏭️  Skipping {skipped} unchanged files (same size)")
+        print(f"⏭️  Skipping {skipped} unchanged files")
     
     if to_upload:
         print(f"📤 Uploading {len(to_upload)} files...")
         success_count = 0
-        for i, esp_path in enumerate(sorted(to_upload)):
-            local_path = local_files[esp_path]
-            if upload_file(local_path, esp32_ip, esp_path):
+        jobs = [(local_files[esp_path], esp_path) for esp_path in to_upload]
+        for esp_path, ok in _upload_many(jobs, esp32_ip, concurrency=concurrency, batch=batch,
+                                         use_async=use_async):
+            if ok:
                 success_count += 1
-                # Small delay after successful upload to let the ESP32 process
-                if i < len(to_upload) - 1:
-                    time.sleep(0.2)
+                cache[esp32_ip + esp_path] = _local_stamp(local_files[esp_path])
         print(f"   ✅ {success_count}/{len(to_upload)} uploaded")
     else:
         print("✅ All files up to date — nothing to upload")
@@ -480,15 +909,19 @@ def sync_files(esp32_ip=ESP32_IP, delete_orphans=True, force=False):
     # Delete orphan files
     if delete_orphans and to_delete:
         print(f"🗑️  Deleting {len(to_delete)} orphan files...")
-        for remote_path in sorted(to_delete):
-            delete_file(remote_path, esp32_ip)
+        for remote_path in to_delete:
+            if delete_file(remote_path, esp32_ip):
+                cache.pop(esp32_ip + remote_path, None)
         print()
     elif to_delete:
         print(f"⚠️  {len(to_delete)} orphan files on ESP32 (use --sync to delete):")
-        for path in sorted(to_delete):
+        for path in to_delete:
             print(f"   {path}")
         print()
     
+    _save_cache(cache)
+    if hashes:
+        _save_cache(hashes, HASH_CACHE_FILE)
     print("✅ Sync complete!")
 
 
@@ -496,13 +929,65 @@ def sync_files(esp32_ip=ESP32_IP, delete_orphans=True, force=False):
 # WATCH MODE
 # ============================================================================
 
-def watch_file(file_path, esp32_ip=ESP32_IP):
-    """Watch file for changes and auto-upload"""
-    print(f"👀 Watching {file_path} for changes...")
+def watch_file(file_path, esp32_ip=ESP32_IP, poll=False, target_path=None):
+    """Watch file for changes and auto-upload (OS file events, or mtime polling)"""
+    use_events = Observer is not None and not poll
+    print(f"👀 Watching {file_path} for changes ({'file events' if use_events else 'polling'})...")
     print("   Press Ctrl+C to stop")
     print()
     
+    if use_events:
+        _watch_events(file_path, esp32_ip, target_path)
+    else:
+        _watch_poll(file_path, esp32_ip, target_path)
+
+
+def _watch_events(file_path, esp32_ip=ESP32_IP, target_path=None):
+    """Upload on OS change notifications for file_path (no idle CPU, no poll latency)"""
+    target = os.path.abspath(file_path)
+    timer = None
+    timer_lock = threading.Lock()
+    
+    def upload_changed():
+        print(f"\n🔄 Change detected at {datetime.now().strftime('%H:%M:%S')}")
+        upload_file(file_path, esp32_ip, target_path)
+        print()
+    
+    class UploadHandler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            nonlocal timer
+            # Editors often save via temp file + rename, so accept created/moved too
+            if event.is_directory or event.event_type not in ('modified', 'created', 'moved'):
+                return
+            if os.path.abspath(getattr(event, 'dest_path', '') or event.src_path) != target:
+                return
+            # Re-arm on every event: one upload once the save burst goes quiet
+            with timer_lock:
+                if timer:
+                    timer.cancel()
+                timer = threading.Timer(WATCH_DEBOUNCE_S, upload_changed)
+                timer.daemon = True
+                timer.start()
+    
+    observer = Observer()
+    observer.schedule(UploadHandler(), os.path.dirname(target), recursive=False)
+    observer.start()
+    try:
+        while observer.is_alive():
+            observer.join(1)
+    except KeyboardInterrupt:
+        print("\n\n👋 Stopped watching")
+    finally:
+        observer.stop()
+        observer.join()
+        if timer:
+            timer.cancel()
+
+
+def _watch_poll(file_path, esp32_ip=ESP32_IP, target_path=None):
+    """Upload when file_path's mtime changes, checked every 0.5s (works on network drives)"""
     last_mtime = 0
+    pending = False  # changed, waiting for the mtime to settle
     
     try:
         while True:
@@ -510,12 +995,16 @@ def watch_file(file_path, esp32_ip=ESP32_IP):
                 current_mtime = os.path.getmtime(file_path)
                 
                 if current_mtime != last_mtime and last_mtime != 0:
+                    pending = True
+                elif pending:
+                    # Unchanged for one tick: a single upload for the whole save burst
+                    pending = False
                     print(f"\n🔄 Change detected at {datetime.now().strftime('%H:%M:%S')}")
-                    upload_file(file_path, esp32_ip)
+                    upload_file(file_path, esp32_ip, target_path)
                     print()
                 
                 last_mtime = current_mtime
-                time.sleep(0.5)
+                time.sleep(WATCH_DEBOUNCE_S if pending else 0.5)
                 
             except FileNotFoundError:
                 print("⚠️  File deleted, waiting...")
@@ -543,8 +1032,10 @@ Examples:
   python upload_html.py --file js/core/app.js  # Upload specific file
   python upload_html.py --all              # Upload all HTML/JS/CSS files
   python upload_html.py --js               # Upload only JS files (recursive)
+  python upload_html.py --all --jobs 6     # Upload all files, 6 at a time
   python upload_html.py --sync             # Smart sync: upload only changed files
   python upload_html.py --sync-force       # Force sync: upload all files
+  python upload_html.py --sync --gzip      # Sync HTML/JS/CSS as pre-compressed .gz copies
   python upload_html.py --list             # List files on ESP32
   python upload_html.py --delete /js/old.js  # Delete specific file on ESP32
   python upload_html.py --backup           # Backup stats.json, playlists.json from ESP32
@@ -556,6 +1047,8 @@ Examples:
     
     parser.add_argument('--watch', '-w', action='store_true',
                         help='Watch file for changes and auto-upload')
+    parser.add_argument('--poll', action='store_true',
+                        help='With --watch: poll mtime instead of OS file events (network drives, no watchdog)')
     parser.add_argument('--file', '-f',
                         help='Specific file to upload (e.g., js/core/app.js)')
     parser.add_argument('--all', '-a', action='store_true',
@@ -563,9 +1056,9 @@ Examples:
     parser.add_argument('--js', action='store_true',
                         help='Upload only JS files (recursive)')
     parser.add_argument('--sync', '-s', action='store_true',
-                        help='Smart sync: upload changed files + delete orphans (compares size)')
+                        help='Smart sync: upload changed files + delete orphans (size/mtime cache)')
     parser.add_argument('--sync-force', action='store_true',
-                        help='Force sync: upload ALL files + delete orphans (ignores size match)')
+                        help='Force sync: upload ALL files + delete orphans (ignores upload cache)')
     parser.add_argument('--list', '-l', action='store_true',
                         help='List files on ESP32')
     parser.add_argument('--delete', '-d',
@@ -578,6 +1071,15 @@ Examples:
                         help='Restore backup: without arg = latest, or specify filename')
     parser.add_argument('--no-backup', action='store_true',
                         help='Skip automatic backup before --sync or --all')
+    parser.add_argument('--concurrency', '--jobs', '-j', dest='concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'Parallel uploads for sync/--all/--js (default: {DEFAULT_CONCURRENCY}, 1 = sequential; '
+                             'older firmware is always uploaded to sequentially)')
+    parser.add_argument('--no-batch', action='store_true',
+                        help=f'One POST per file (default: up to {BATCH_MAX_FILES} small files per POST)')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help='Run bulk uploads on asyncio/aiohttp instead of threads (needs aiohttp)')
+    parser.add_argument('--gzip', action='store_true',
+                        help='Upload HTML/JS/CSS gzip-compressed as <name>.gz (served with Content-Encoding: gzip)')
     parser.add_argument('--ip', default=ESP32_IP,
                         help=f'ESP32 IP address (default: {ESP32_IP})')
     
@@ -629,7 +1131,9 @@ Examples:
     if args.sync or args.sync_force:
         if not args.no_backup:
             backup_critical_files(args.ip)
-        sync_files(args.ip, delete_orphans=True, force=args.sync_force)
+        sync_files(args.ip, delete_orphans=True, force=args.sync_force,
+                   concurrency=args.concurrency, batch=not args.no_batch, use_async=args.use_async,
+                   compress=args.gzip)
         return
     
     # Collect files to upload
@@ -665,16 +1169,14 @@ Examples:
         if len(files_to_upload) > 1:
             print("❌ Error: --watch only supports single file")
             sys.exit(1)
-        watch_file(files_to_upload[0], args.ip)
+        target = _gzip_target(files_to_upload[0]) if args.gzip else None
+        watch_file(files_to_upload[0], args.ip, poll=args.poll, target_path=target)
     else:
-        # Upload
-        success = 0
-        for i, file_path in enumerate(files_to_upload):
-            if upload_file(file_path, args.ip):
-                success += 1
-                # Small delay after successful upload to let the ESP32 process
-                if i < len(files_to_upload) - 1:
-                    time.sleep(0.2)
+        # Upload (target path derived from the local path)
+        jobs = [(file_path, _gzip_target(file_path) if args.gzip else None) for file_path in files_to_upload]
+        results = _upload_many(jobs, args.ip, concurrency=args.concurrency, batch=not args.no_batch,
+                               use_async=args.use_async)
+        success = sum(ok for _, ok in results)
         
         print()
         print(f"{'✅' if success == len(files_to_upload) else '⚠️ '} {success}/{len(files_to_upload)} files uploaded")